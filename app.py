@@ -1,25 +1,38 @@
-import re, requests, logging, atexit, asyncio
+import re, requests, logging
 from db import db  # Ensure db is initialized in db.py
 from urllib.parse import urlparse
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, abort
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_login import LoginManager, login_required, current_user
 from auth import auth
 from sqlalchemy.orm import sessionmaker, scoped_session
 from flask_cors import CORS, cross_origin
-from apscheduler.schedulers.background import BackgroundScheduler
-from flask_socketio import SocketIO, emit
-import subprocess
-from models import Article, OllamaSettings, NewsSource
+from flask_socketio import SocketIO, emit, join_room
+from models import OllamaSettings, NewsSource
+import scheduler
+from jobs import JobManager
+from metrics import render_prometheus
+from live import LiveFrontPage, LIVE_ROOM
+from profiler import init_profiler, recent_profiles
+from frontpage import front_page, current_version, ranking_time, ranked_articles, decode_cursor, FRONT_PAGE_SIZE, API_MAX_PAGE_SIZE
+import hashlib
+import os
 from flask import current_app
 
 app = Flask(__name__)
 app.config.from_object("config.Config")
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 CORS(app, supports_credentials=True)
+init_profiler(app)
 
 socketio = SocketIO(app)
+job_manager = JobManager(
+    emit=socketio.emit,
+    max_workers=app.config["JOB_WORKERS"],
+    lock_path=lambda name: os.path.join(app.config["JOB_LOCK_DIR"], f"job-{name}.lock"),
+)
+live_front_page = LiveFrontPage(socketio, app)
 app.register_blueprint(auth)
 
 db.init_app(app)  
@@ -37,9 +50,85 @@ def load_user(user_id):
 
 @app.route("/")
 def home():
-    top_articles = Article.query.order_by(Article.score.desc()).limit(50).all()
-    top_article = top_articles[0] if top_articles else None 
-    return render_template("index.html", top_article=top_article, articles=top_articles, user=current_user)
+    if current_user.is_authenticated:
+        return front_page.render(current_user)
+    return front_page.anonymous_html(current_user)
+
+@app.route("/api/articles")
+def api_articles():
+    """Ranked articles as JSON, paginated by an opaque (score, id) cursor."""
+    try:
+        limit = min(max(int(request.args.get("limit", FRONT_PAGE_SIZE)), 1), API_MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({"error": "Invalid 'limit' parameter."}), 400
+
+    cursor = request.args.get("cursor")
+    categories = sorted(set(request.args.getlist("category")))
+
+    # The ranking only changes when a scrape commits or the decay window rolls over, so
+    # those plus the query parameters identify the response and 304s need no database access.
+    version = current_version()
+    now = ranking_time()
+    key = f"{version}|{int(now.timestamp())}|{limit}|{cursor or ''}|{','.join(categories)}"
+    etag = hashlib.sha1(key.encode()).hexdigest()
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        return jsonify({"error": "Invalid 'cursor' parameter."}), 400
+
+    articles, next_cursor = ranked_articles(limit=limit, after=after, categories=categories, now=now)
+    for article in articles:
+        article["timestamp"] = article["timestamp"].isoformat() if article["timestamp"] else None
+
+    response = jsonify({"articles": articles, "next_cursor": next_cursor, "version": version})
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+@app.route("/category/<slug>/")
+def category_page(slug):
+    """Same page as the snapshot's category/<slug>/index.html, for visitors it doesn't cover."""
+    from snapshot import category_slug, enabled_categories, render_category_page
+
+    category = next((name for name in enabled_categories() if category_slug(name) == slug), None)
+    if category is None:
+        abort(404)
+    return render_category_page(category, current_user)
+
+def run_search():
+    """Parses the shared /search and /api/search parameters; returns (query, limit, offset, results)."""
+    from search import search_articles
+
+    query = request.args.get("q", "").strip()
+    limit = min(max(request.args.get("limit", 20, type=int), 1), API_MAX_PAGE_SIZE)
+    offset = max(request.args.get("offset", 0, type=int), 0)
+    results = []
+    if query:
+        results = search_articles(
+            db.engine, query, ranking_time(), limit=limit, offset=offset,
+            candidates=app.config["SEARCH_CANDIDATES"], text_weight=app.config["SEARCH_TEXT_WEIGHT"],
+        )
+    return query, limit, offset, results
+
+@app.route("/search")
+def search():
+    query, _limit, _offset, results = run_search()
+    return render_template("search.html", user=current_user, query=query, results=results)
+
+@app.route("/api/search")
+def api_search():
+    query, limit, offset, results = run_search()
+    if not query:
+        return jsonify({"error": "Missing 'q' parameter."}), 400
+    for article in results:
+        article["timestamp"] = article["timestamp"].isoformat() if article["timestamp"] else None
+    next_offset = offset + limit if len(results) == limit else None
+    return jsonify({"query": query, "articles": results, "next_offset": next_offset}), 200
 
 @app.route("/settings")
 @login_required
@@ -89,7 +178,11 @@ def get_feeds():
                 "url": feed.url,
                 "category": feed.category,
                 "enabled": feed.enabled,
-                "scrape_status": feed.scrape_status or "Not scraped"
+                "scrape_status": feed.scrape_status or "Not scraped",
+                "publish_rate": feed.publish_rate,
+                "poll_interval_minutes": feed.poll_interval_minutes,
+                "next_poll_at": feed.next_poll_at.isoformat() if feed.next_poll_at else None,
+                "consecutive_failures": feed.consecutive_failures
             } for feed in feeds
         ]
     }), 200
@@ -111,62 +204,66 @@ def add_feed():
     db.session.commit()
     return jsonify({"message": "✅ RSS feed added successfully!"}), 200
 
-def send_logs(process):
+@app.route("/import-opml", methods=["POST"])
+@login_required
+def import_opml():
+    from seed import parse_opml, import_feeds
+    from xml.etree.ElementTree import ParseError
+
+    uploads = request.files.getlist("file")
+    if not uploads:
+        return jsonify({"error": "Upload one or more OPML files as 'file'."}), 400
+
+    feeds = []
     try:
-        for line in iter(process.stdout.readline, ""):
-            if line:
-                socketio.emit('log', {'message': line.strip()})
-        process.stdout.close()
-        process.wait()
-    except Exception as e:
-        socketio.emit('log', {'message': f"Error while reading process output: {str(e)}"})
-        current_app.logger.error(f"Error while reading process output: {str(e)}")
-    finally:
-        if process.returncode != 0:
-            socketio.emit('log', {'message': f"Process failed with return code: {process.returncode}"})
-            current_app.logger.error(f"Process failed with return code: {process.returncode}")
-        else:
-            socketio.emit('log', {'message': 'Process completed successfully'})
+        for upload in uploads:
+            feeds.extend(parse_opml(upload.read(), request.form.get("category") or None))
+    except ParseError as e:
+        return jsonify({"error": f"Invalid OPML: {e}"}), 400
 
+    added, skipped = import_feeds(feed for feed in feeds if is_valid_url(feed[1]))
+    return jsonify({"message": f"✅ Imported {added} feeds.", "added": added, "skipped": skipped}), 200
 
 @app.route("/run-jobs", methods=["POST"])
 @login_required
 def run_jobs():
-    try:
-        current_app.logger.info("Starting job: scraper.py")
-
-        process = subprocess.Popen(
-            ['python3', '-u', 'scraper.py'],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            universal_newlines=True
-        )
-
-        socketio.emit('log', {'message': 'Job started, running scraper.py...'})
-        
-
-        socketio.start_background_task(target=send_logs, process=process)
-
-        return jsonify({"message": "Job scheduled to run immediately!"}), 200
-
-    except Exception as e:
-        error_message = f"An error occurred: {str(e)}"
-        current_app.logger.error(error_message)
-        socketio.emit('log', {'message': error_message})
-        return jsonify({"error": error_message}), 500
-
-
-
+    from scraper import run_scrape_job
 
+    job, created = job_manager.submit("scrape", run_scrape_job)
+    if job is None:
+        return jsonify({"message": "A scrape is already running in another process."}), 409
+    if not created:
+        return jsonify({"message": "A scrape is already running.", "job": job.to_dict()}), 409
+    current_app.logger.info(f"Started scrape job {job.id}")
+    return jsonify({"message": "Job started!", "job": job.to_dict()}), 202
 
+@app.route("/jobs", methods=["GET"])
+@login_required
+def list_jobs():
+    return jsonify({"jobs": [job.to_dict() for job in job_manager.recent()]}), 200
 
+@app.route("/jobs/<job_id>", methods=["GET"])
+@login_required
+def get_job(job_id):
+    job = job_manager.get(job_id)
+    if not job:
+        return jsonify({"error": "Job not found."}), 404
+    return jsonify(job.to_dict(include_events=True)), 200
 
 @socketio.on('connect')
 def handle_connect():
     print('Client connected.')
 
-if __name__ == "__main__":
-    socketio.run(app, host="0.0.0.0", port=5000, debug=True)
+@socketio.on('subscribe_front_page')
+def subscribe_front_page(data=None):
+    if not app.config["LIVE_UPDATES"]:
+        return
+    join_room(LIVE_ROOM)
+    live_front_page.subscribe(request.sid, (data or {}).get("ids"))
+
+@socketio.on('disconnect')
+def handle_disconnect(*args):
+    live_front_page.unsubscribe(request.sid)
 
 @app.route("/delete-feed/<int:feed_id>", methods=["DELETE"])
 @login_required
@@ -191,31 +288,48 @@ def update_feed(feed_id):
         return jsonify({"error": "Missing 'enabled' field."}), 400
 
     feed.enabled = enabled
+    if enabled:
+        # Re-enabling a quarantined feed gives it a clean slate.
+        feed.consecutive_failures = 0
+        feed.next_poll_at = None
     db.session.commit()
     return jsonify({"message": "✅ Feed updated successfully!"}), 200
 
-def run_scraper():
-    from scraper import scrape_articles
-    asyncio.run(scrape_articles())
-    # Emit log to frontend when the job starts
-    socketio.emit('log', {'message': 'Scraper started...'})
-    
-    try:
-        # Emit log as the scraper works
-        socketio.emit('log', {'message': 'Scraping in progress...'})
-    except Exception as e:
-        socketio.emit('log', {'message': f'Error occurred: {str(e)}'})
-    
-    # End of the job
-    socketio.emit('log', {'message': 'Scraper job completed.'})
+def run_scraper(due_only=False, maintenance=True):
+    """Scheduled entry point; shares the job manager so it never overlaps a manual run."""
+    from scraper import run_scrape_job
+
+    job, _created = job_manager.submit("scrape", run_scrape_job, due_only=due_only, maintenance=maintenance)
+    if job is None:
+        print("⏭️ Skipping scheduled scrape: another process is running one.")
+        return
+    job.future.result()
+
+def run_maintenance():
+    from scraper import run_maintenance_job
+
+    job, _created = job_manager.submit("maintenance", run_maintenance_job)
+    if job is None:
+        print("⏭️ Skipping scheduled maintenance: another process is running it.")
+        return
+    job.future.result()
+
+@app.route("/debug/sql")
+@login_required
+def debug_sql():
+    if not app.config["SQL_PROFILING"]:
+        return jsonify({"error": "SQL profiling is disabled; set SQL_PROFILING=true."}), 404
+    return jsonify({"profiles": recent_profiles()}), 200
+
+@app.route("/metrics")
+def metrics():
+    return app.response_class(render_prometheus(), mimetype="text/plain; version=0.0.4")
 
 @app.route('/api/tags')
 def get_tags():
     return {"message": "CORS enabled"}
 
-# Scheduler for periodic scraping jobs every 3 hours
-scheduler = BackgroundScheduler()
-scheduler.add_job(func=run_scraper, trigger='cron', hour='*/3')
-scheduler.start()
+if __name__ == "__main__":
+    scheduler.ensure_started(app)
+    socketio.run(app, host="0.0.0.0", port=5000, debug=True)
 
-atexit.register(lambda: scheduler.shutdown())
@@ -0,0 +1,312 @@
+"""Offline benchmarks for scraping and serving.
+
+Builds a synthetic database in a temporary directory, serves synthetic feeds and article
+pages from a local HTTP server, times the scrape, rescore, cleanup and front page paths,
+and writes the timings as JSON so runs can be compared across commits:
+
+    python benchmark.py --articles 100k --feeds 50 --latency-ms 20
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, UTC
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from xml.sax.saxutils import escape
+
+WORDS = (
+    "government city market report council storm company court minister plan talks police "
+    "election bank prices school river vote energy study team officials deal border trade "
+    "hospital airport budget weather fire union workers leaders investors region global"
+).split()
+KEYWORDS = ["BREAKING", "war", "tariffs", "earthquake", "hack", "inflation", "celebrity", "election", "outbreak"]
+
+
+def headline(rng):
+    words = rng.sample(WORDS, rng.randint(5, 9))
+    if rng.random() < 0.4:
+        words.insert(rng.randrange(len(words)), rng.choice(KEYWORDS))
+    return " ".join(words).capitalize()
+
+
+def parse_count(value):
+    """Accepts 10000, 10k or 1m."""
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(value[-1].lower(), 1)
+    return int(float(value.rstrip("kKmM")) * multiplier)
+
+
+class FixtureServer:
+    """Serves /feed/<n>.xml RSS documents and /article/<n>/<i>.html pages on localhost.
+
+    Content is deterministic for a given seed. Feeds send an ETag and honour If-None-Match,
+    so a second scrape exercises the conditional GET path; `latency` seconds are added to
+    every response.
+    """
+
+    def __init__(self, items=30, page_bytes=20_000, latency=0.0, seed=1):
+        self.items = items
+        self.page_bytes = page_bytes
+        self.latency = latency
+        self.seed = seed
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                parts = self.path.strip("/").split("/")
+                if parts[0] == "feed":
+                    body, content_type = server.feed(int(parts[1].split(".")[0])), "application/rss+xml"
+                elif parts[0] == "article":
+                    body, content_type = server.page(int(parts[1]), int(parts[2].split(".")[0])), "text/html"
+                else:
+                    self.send_error(404)
+                    return
+
+                etag = f'"{zlib.crc32(body):08x}"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self._httpd.server_port}"
+
+    def feed(self, feed_id):
+        rng = random.Random(self.seed * 100_003 + feed_id)
+        items = "".join(
+            f"<item><title>{escape(headline(rng))}</title>"
+            f"<link>{self.base_url}/article/{feed_id}/{i}.html</link>"
+            f"<slash:comments>{rng.randint(0, 300)}</slash:comments></item>"
+            for i in range(self.items)
+        )
+        return (
+            '<?xml version="1.0"?><rss version="2.0" xmlns:slash="http://purl.org/rss/1.0/modules/slash/">'
+            f"<channel><title>Fixture feed {feed_id}</title>{items}</channel></rss>"
+        ).encode()
+
+    def page(self, feed_id, item):
+        head = (
+            f'<html><head><title>Article {feed_id}/{item}</title>'
+            f'<meta property="og:image" content="{self.base_url}/img/{feed_id}-{item}.jpg"></head><body>'
+        )
+        padding = "<p>" + "lorem ipsum " * max(0, (self.page_bytes - len(head)) // 12) + "</p>"
+        return (head + padding + "</body></html>").encode()
+
+    def __enter__(self):
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def generate_db(articles, sources, seed=1, chunk_size=10_000):
+    """Fills the configured (empty) database with disabled sources and scored articles.
+
+    Timestamps are spread over 1.5x the retention window, so roughly a third of the rows are
+    due for cleanup.
+    """
+    from sqlalchemy import insert
+    from app import app, db
+    from models import Article, NewsSource, epoch_hours, score_at
+    from scraper import score_components, matched_categories, categories_to_mask
+
+    rng = random.Random(seed)
+    now = datetime.now(UTC)
+    spread = app.config["RETENTION_HOURS"] * 1.5 * 3600
+
+    with app.app_context():
+        db.create_all()
+        db.session.execute(insert(NewsSource), [
+            {"name": f"Synthetic {i}", "url": f"https://synthetic{i % 97}.example/feed/{i}", "category": rng.choice(["World", "Tech", "US"]), "enabled": False}
+            for i in range(sources)
+        ])
+        db.session.commit()
+
+        for start in range(0, articles, chunk_size):
+            rows = []
+            for i in range(start, min(start + chunk_size, articles)):
+                source_id = rng.randint(1, sources)
+                title = headline(rng)
+                url = f"https://synthetic{source_id % 97}.example/{i}"
+                timestamp = now - timedelta(seconds=rng.uniform(0, spread))
+                matched = matched_categories(title)
+                engagement = rng.randint(0, 30)
+                _engagement, base, rate, cap = score_components(
+                    SimpleNamespace(title=title, url=url, engagement=engagement), matched=matched
+                )
+                rows.append({
+                    "title": title, "url": url, "source_id": source_id, "timestamp": timestamp,
+                    "image_url": f"https://img.example/{i}.jpg" if rng.random() < 0.7 else None,
+                    "keyword_mask": categories_to_mask(matched), "engagement": engagement,
+                    "base_score": base, "decay_rate": rate, "score_cap": cap,
+                    "decay_origin": base + rate * epoch_hours(timestamp),
+                    "score": score_at(base, rate, cap, (now - timestamp).total_seconds() / 3600),
+                })
+            db.session.execute(insert(Article), rows)
+            db.session.commit()
+
+
+def timed(name, results, func, quiet=True, **extra):
+    """Runs `func`, records its wall time (plus any extra fields it returns) under `name`."""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output) if quiet else contextlib.nullcontext():
+        started = time.perf_counter()
+        value = func()
+        seconds = time.perf_counter() - started
+    results[name] = {"seconds": round(seconds, 4), **extra, **(value or {})}
+    print(f"⏱️ {name}: {seconds:.3f}s {value or ''}")
+
+
+def run_benchmarks(args, workdir):
+    from app import app, db
+    from models import Article, NewsSource
+    from frontpage import front_page
+    import scraper
+
+    results = {}
+    started = time.perf_counter()
+    generate_db(args.articles, args.sources, seed=args.seed)
+    results["generate_db"] = {"seconds": round(time.perf_counter() - started, 4), "articles": args.articles}
+    print(f"🗄️ Generated {args.articles} articles in {results['generate_db']['seconds']:.1f}s")
+
+    client = app.test_client()
+
+    def render(cold):
+        def run():
+            started = time.perf_counter()
+            for _ in range(args.renders):
+                if cold:
+                    front_page.invalidate()
+                client.get("/")
+            return {"ms_per_request": round((time.perf_counter() - started) * 1000 / args.renders, 3)}
+        return run
+
+    timed("front_page_cold", results, render(cold=True), renders=args.renders)
+    timed("front_page_warm", results, render(cold=False), renders=args.renders)
+    timed("api_articles", results, lambda: {"status": client.get("/api/articles?limit=100").status_code})
+
+    def rescore():
+        asyncio.run(scraper.update_existing_article_scores(recompute_keywords=True))
+    timed("rescore", results, rescore, quiet=not args.verbose)
+
+    with FixtureServer(items=args.items, page_bytes=args.page_bytes, latency=args.latency_ms / 1000, seed=args.seed) as server:
+        with app.app_context():
+            db.session.add_all(
+                NewsSource(name=f"Fixture {i}", url=f"{server.base_url}/feed/{i}.xml", category="Fixture")
+                for i in range(args.feeds)
+            )
+            db.session.commit()
+
+        def scrape():
+            before = server.requests
+            asyncio.run(scraper.scrape_articles())
+            return {"http_requests": server.requests - before}
+        timed("scrape_cold", results, scrape, quiet=not args.verbose, feeds=args.feeds, items=args.items)
+        timed("scrape_warm", results, scrape, quiet=not args.verbose, feeds=args.feeds)
+
+    def cleanup():
+        with app.app_context():
+            before = Article.query.count()
+        scraper.cleanup_old_articles()
+        with app.app_context():
+            return {"deleted": before - Article.query.count()}
+    timed("cleanup", results, cleanup, quiet=not args.verbose)
+
+    results["db_bytes"] = os.path.getsize(os.path.join(workdir, "news.db"))
+    return results
+
+
+def git_revision():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=parse_count, default=parse_count("10k"), help="synthetic articles (10k, 100k, 1m, ...)")
+    parser.add_argument("--sources", type=int, default=500, help="synthetic sources the articles belong to")
+    parser.add_argument("--feeds", type=int, default=50, help="fixture feeds to scrape")
+    parser.add_argument("--items", type=int, default=30, help="entries per fixture feed")
+    parser.add_argument("--page-bytes", type=int, default=20_000, help="size of each fixture article page")
+    parser.add_argument("--latency-ms", type=float, default=0, help="added latency per fixture response")
+    parser.add_argument("--renders", type=int, default=200, help="front page requests per render benchmark")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="bench-results", help="directory for the JSON results")
+    parser.add_argument("--keep", action="store_true", help="keep the temporary database directory")
+    parser.add_argument("--verbose", action="store_true", help="show scraper output")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="news-bench-")
+    # Must be set before app/config are imported: the database and side files live in workdir
+    os.environ.update({
+        "DATABASE_URL": "sqlite:///" + os.path.join(workdir, "news.db"),
+        "SCRAPE_VERSION_FILE": os.path.join(workdir, "scrape.version"),
+        "SCHEDULER_MODE": "off",
+        "RETENTION_ARCHIVE_DIR": "",
+    })
+    import app  # noqa: F401  (configures logging)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    try:
+        results = run_benchmarks(args, workdir)
+    finally:
+        if args.keep:
+            print(f"📁 Kept benchmark database in {workdir}")
+        else:
+            import shutil
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    commit, dirty = git_revision()
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "created_at": datetime.now(UTC).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "params": {key: value for key, value in vars(args).items() if key not in ("output", "keep", "verbose")},
+        "results": results,
+    }
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"{datetime.now(UTC):%Y%m%d-%H%M%S}-{commit or 'nogit'}-{args.articles}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"📊 Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
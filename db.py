@@ -0,0 +1,51 @@
+import sqlite3
+
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+db = SQLAlchemy()
+
+# Applied to every new SQLite connection. WAL lets readers (the web workers) keep going
+# while the scraper writes, and NORMAL sync is durable in WAL mode apart from the last
+# commit on power loss. The busy timeout is set through connect_args below so writers wait
+# for the lock instead of failing with "database is locked".
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -32000,  # negative = KiB, so ~32 MB per connection
+    "temp_store": "MEMORY",
+    "mmap_size": 134217728,
+}
+
+
+@event.listens_for(Engine, "connect")
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def sqlite_engine_options(uri, busy_timeout_seconds=5, pool_size=10, max_overflow=10):
+    """Engine options for Flask-SQLAlchemy; only SQLite file databases get pool tuning."""
+    if not uri.startswith("sqlite:///") or uri == "sqlite:///:memory:":
+        return {"pool_pre_ping": True}
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": 30,
+        "connect_args": {"timeout": busy_timeout_seconds, "check_same_thread": False},
+    }
+
+
+def new_session():
+    """Session for background work (scraper, jobs) outside Flask's request-scoped session.
+
+    Objects are not expired on commit, so committing after every feed keeps write
+    transactions short without reloading each row on its next attribute access.
+    """
+    return Session(bind=db.engine, expire_on_commit=False)
@@ -0,0 +1,252 @@
+import asyncio
+import codecs
+import hashlib
+import time
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlparse
+
+import feedparser
+import httpx
+
+USER_AGENT = "Mozilla/5.0 (compatible; DrudgeReportFlask/1.0; +https://github.com/kaspaeve/Drudge-Report-Flask)"
+
+
+@dataclass
+class FeedFetchResult:
+    """Outcome of downloading and parsing a single feed."""
+    url: str
+    feed: object = None
+    status_code: int = None
+    error: str = None
+    headers: dict = field(default_factory=dict)
+    etag: str = None
+    last_modified: str = None
+    content_hash: str = None
+    not_modified: bool = False  # server answered 304
+    unchanged: bool = False  # body identical to the previous run
+    bytes_received: int = 0
+    fetch_seconds: float = 0.0
+    parse_seconds: float = 0.0
+
+    @property
+    def cache_hit(self):
+        return self.not_modified or self.unchanged
+
+    @property
+    def entries(self):
+        if self.feed is None:
+            return []
+        return self.feed.get("entries") or []
+
+
+class HostLimiter:
+    """Caps how many requests may be in flight against the same host at once."""
+
+    def __init__(self, per_host):
+        self.per_host = per_host
+        self._semaphores = {}
+
+    def for_url(self, url):
+        try:
+            host = urlparse(url).netloc.lower()
+        except ValueError:  # malformed URLs share one bucket; the request itself reports the error
+            host = ""
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.per_host)
+        return self._semaphores[host]
+
+
+def create_client(max_connections=20, timeout=15):
+    """Builds the shared, pooled HTTP client used for a scrape run."""
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(timeout),
+        limits=limits,
+        follow_redirects=True,
+        headers={"User-Agent": USER_AGENT},
+    )
+
+
+def parse_feed(content, headers=None):
+    """Parses raw feed bytes; CPU bound, so callers run it off the event loop."""
+    return feedparser.parse(content, response_headers=headers or {})
+
+
+def conditional_headers(etag=None, last_modified=None):
+    """Builds the validator headers for a conditional GET."""
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+async def fetch_feed(client, url, semaphore, host_limiter, etag=None, last_modified=None, content_hash=None,
+                     deadline=None):
+    """Downloads a feed through the shared client and parses it in a worker thread.
+
+    The stored validators are sent as a conditional request; a 304, or a body whose hash
+    matches `content_hash`, short-circuits before any parsing is done. `deadline` bounds the
+    whole download, since httpx timeouts only apply to each individual read.
+    """
+    async with semaphore, host_limiter.for_url(url):
+        started = time.perf_counter()
+        try:
+            async with asyncio.timeout(deadline):
+                response = await client.get(url, headers=conditional_headers(etag, last_modified))
+        except httpx.HTTPError as e:
+            return FeedFetchResult(url=url, error=f"{type(e).__name__}: {e}",
+                                   fetch_seconds=time.perf_counter() - started)
+        except TimeoutError:
+            return FeedFetchResult(url=url, error=f"Timed out after {deadline}s",
+                                   fetch_seconds=time.perf_counter() - started)
+        except Exception as e:
+            # Bad URLs raise outside httpx.HTTPError (InvalidURL, IDNA UnicodeError, ...); one
+            # broken source must not abort the whole run.
+            return FeedFetchResult(url=url, error=f"{type(e).__name__}: {e}",
+                                   fetch_seconds=time.perf_counter() - started)
+        fetch_seconds = time.perf_counter() - started
+
+    headers = dict(response.headers)
+    validators = dict(
+        etag=response.headers.get("etag") or etag,
+        last_modified=response.headers.get("last-modified") or last_modified,
+    )
+    if response.status_code == 304:
+        return FeedFetchResult(url=url, status_code=304, headers=headers, not_modified=True,
+                               content_hash=content_hash, fetch_seconds=fetch_seconds, **validators)
+    if response.status_code >= 400:
+        return FeedFetchResult(url=url, status_code=response.status_code, headers=headers,
+                               error=f"HTTP {response.status_code}", bytes_received=len(response.content),
+                               fetch_seconds=fetch_seconds)
+
+    body = response.content
+    body_hash = hashlib.sha256(body).hexdigest()
+    if content_hash and body_hash == content_hash:
+        return FeedFetchResult(url=url, status_code=response.status_code, headers=headers, unchanged=True,
+                               content_hash=body_hash, bytes_received=len(body), fetch_seconds=fetch_seconds,
+                               **validators)
+
+    started = time.perf_counter()
+    feed = await asyncio.to_thread(parse_feed, body, headers)
+    return FeedFetchResult(url=url, feed=feed, status_code=response.status_code, headers=headers,
+                           content_hash=body_hash, bytes_received=len(body), fetch_seconds=fetch_seconds,
+                           parse_seconds=time.perf_counter() - started, **validators)
+
+
+async def fetch_feeds(sources, max_concurrency=20, max_per_host=4, timeout=15, deadline=None):
+    """Fetches many feeds concurrently, yielding (source, result) pairs as each one finishes.
+
+    `sources` may be any objects with a `url` attribute (and optionally `etag`, `last_modified`
+    and `content_hash` validators); they are passed back untouched so the caller can match
+    results to rows without touching the database from worker tasks.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    host_limiter = HostLimiter(max_per_host)
+
+    async with create_client(max_connections=max_concurrency, timeout=timeout) as client:
+        async def run(source, url, validators):
+            return source, await fetch_feed(client, url, semaphore, host_limiter, deadline=deadline, **validators)
+
+        tasks = [
+            asyncio.create_task(run(source, source.url, dict(
+                etag=getattr(source, "etag", None),
+                last_modified=getattr(source, "last_modified", None),
+                content_hash=getattr(source, "content_hash", None),
+            )))
+            for source in sources
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+class HeadImageParser(HTMLParser):
+    """Minimal parser that only looks at <head> for the page's preview image."""
+
+    IMAGE_PROPERTIES = ("og:image", "og:image:url", "og:image:secure_url", "twitter:image", "twitter:image:src")
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.candidates = {}
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "body":
+            self.done = True
+            return
+        attrs = dict(attrs)
+        if tag == "meta":
+            key = (attrs.get("property") or attrs.get("name") or "").lower()
+            if key in self.IMAGE_PROPERTIES and attrs.get("content"):
+                self.candidates.setdefault(key, attrs["content"].strip())
+        elif tag == "link" and (attrs.get("rel") or "").lower() == "image_src" and attrs.get("href"):
+            self.candidates.setdefault("image_src", attrs["href"].strip())
+
+    def handle_endtag(self, tag):
+        if tag == "head":
+            self.done = True
+
+    @property
+    def image(self):
+        for key in self.IMAGE_PROPERTIES + ("image_src",):
+            if self.candidates.get(key):
+                return self.candidates[key]
+        return None
+
+
+async def fetch_page_image(client, url, semaphore, host_limiter, max_bytes=262144, deadline=None):
+    """Streams an article page just far enough to read its preview image from <head>.
+
+    Returns an (image_url, error) pair; image_url is None when the page has no preview image.
+    """
+    async with semaphore, host_limiter.for_url(url):
+        try:
+            async with asyncio.timeout(deadline), client.stream("GET", url) as response:
+                if response.status_code >= 400:
+                    return None, f"HTTP {response.status_code}"
+                if "html" not in response.headers.get("content-type", "text/html"):
+                    return None, None
+
+                parser = HeadImageParser()
+                decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+                received = 0
+                async for chunk in response.aiter_bytes():
+                    received += len(chunk)
+                    parser.feed(decoder.decode(chunk))
+                    if parser.done or received >= max_bytes:
+                        break
+                image = parser.image
+                return (urljoin(str(response.url), image) if image else None), None
+        except TimeoutError:
+            print(f"⚠️ Failed to fetch page: {url} | Timed out after {deadline}s")
+            return None, f"Timed out after {deadline}s"
+        except Exception as e:
+            # httpx.HTTPError, unknown encodings, and bad links (InvalidURL, IDNA UnicodeError):
+            # a single broken entry.link must not fail the whole image stage.
+            print(f"⚠️ Failed to fetch page: {url} | Error: {e}")
+            return None, f"{type(e).__name__}: {e}"
+
+
+async def resolve_images(urls, max_concurrency=10, max_per_host=4, timeout=10, max_bytes=262144, deadline=None):
+    """Resolves preview images for many article pages through one bounded, pooled client.
+
+    Returns a dict mapping each url to an (image_url, error) pair.
+    """
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        return {}
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    host_limiter = HostLimiter(max_per_host)
+    async with create_client(max_connections=max_concurrency, timeout=timeout) as client:
+        results = await asyncio.gather(*[
+            fetch_page_image(client, url, semaphore, host_limiter, max_bytes=max_bytes, deadline=deadline)
+            for url in urls
+        ])
+    return dict(zip(urls, results))
@@ -0,0 +1,171 @@
+import os
+import threading
+import time
+from datetime import datetime, UTC
+from flask import current_app, render_template
+from sqlalchemy import and_, or_
+from models import Article, NewsSource
+
+FRONT_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 200
+
+# Called with no arguments after every bump in this process (e.g. to wake live pushes)
+version_listeners = []
+
+
+def current_version():
+    """Returns the scrape version token shared by every process through a small file."""
+    try:
+        with open(current_app.config["SCRAPE_VERSION_FILE"]) as f:
+            return int(f.read().strip() or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def bump_version():
+    """Marks the ranking as changed; call after a scrape, rescore or cleanup commits."""
+    path = current_app.config["SCRAPE_VERSION_FILE"]
+    # A fresh timestamp rather than read-increment-write: two processes bumping at once
+    # would otherwise both write the same number, and one of the changes would keep
+    # serving the other's cached page and ETag. Microseconds keep it below 2**53, so
+    # JavaScript clients reading "version" from the API get the exact value.
+    version = time.time_ns() // 1000
+    if version == current_version():
+        version += 1
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(str(version))
+    os.replace(tmp_path, path)
+    front_page.invalidate()
+    for listener in version_listeners:
+        listener()
+    return version
+
+
+def ranking_time():
+    """The "now" used for ranking, rounded down to RANK_REFRESH_SECONDS.
+
+    Scores decay continuously, so rounding lets caches and ETags stay valid for a short
+    window while the ordering is still never more than one window stale.
+    """
+    step = current_app.config["RANK_REFRESH_SECONDS"]
+    now = datetime.now(UTC).timestamp()
+    return datetime.fromtimestamp(now - now % step, UTC)
+
+
+def load_front_page(limit=FRONT_PAGE_SIZE, now=None):
+    """Loads the top-ranked articles as plain dicts so they can outlive the session.
+
+    Only the best-ranked article of each story is kept, so one event reported by many feeds
+    takes a single slot; a few extra rows are read to make up for the collapsed duplicates.
+    """
+    rank = Article.rank_at(now or ranking_time())
+    rows = Article.query.with_entities(
+        Article.id, Article.title, Article.url, Article.image_url, rank.label("score"), Article.source_id,
+        Article.story_id,
+    ).order_by(rank.desc(), Article.id.desc()).limit(limit * 4).all()
+
+    articles, seen_stories = [], set()
+    for row in rows:
+        story = row.story_id or -row.id
+        if story in seen_stories:
+            continue
+        seen_stories.add(story)
+        articles.append(row._asdict())
+        if len(articles) == limit:
+            break
+    return articles
+
+
+def encode_cursor(article, now):
+    return f"{article['score']}:{article['id']}:{int(now.timestamp())}"
+
+
+def decode_cursor(cursor):
+    """Parses a "score:id:time" cursor; raises ValueError when it is malformed."""
+    score, article_id, timestamp = cursor.split(":", 2)
+    try:
+        ranked_at = datetime.fromtimestamp(int(timestamp), UTC)
+    except (OverflowError, OSError) as e:  # a timestamp outside the platform's range
+        raise ValueError(f"invalid cursor time: {timestamp}") from e
+    return float(score), int(article_id), ranked_at
+
+
+def ranked_articles(limit=FRONT_PAGE_SIZE, after=None, categories=None, now=None):
+    """Returns one page of the ranking using keyset pagination on (live score, id).
+
+    `after` is the decoded cursor of the last article on the previous page. It carries the
+    ranking time of the first page so later pages are ordered exactly the same way; fetching
+    one extra row tells us whether another page exists without a COUNT query.
+    """
+    if after:
+        now = after[2]
+    now = now or ranking_time()
+    rank = Article.rank_at(now)
+
+    query = Article.query.with_entities(
+        Article.id, Article.title, Article.url, Article.image_url, rank.label("score"),
+        Article.timestamp, Article.story_id, NewsSource.name.label("source"), NewsSource.category,
+    ).join(NewsSource, Article.source_id == NewsSource.id)
+
+    if categories:
+        query = query.filter(NewsSource.category.in_(categories))
+    if after:
+        score, article_id, _now = after
+        query = query.filter(or_(rank < score, and_(rank == score, Article.id < article_id)))
+
+    rows = query.order_by(rank.desc(), Article.id.desc()).limit(limit + 1).all()
+    articles = [row._asdict() for row in rows[:limit]]
+    next_cursor = encode_cursor(articles[-1], now) if len(rows) > limit else None
+    return articles, next_cursor
+
+
+class FrontPageCache:
+    """In-process copy of the top articles and the anonymous front page HTML.
+
+    The cache is keyed on the scrape version and the ranking time window, so a bump from any
+    process (including the scraper subprocess) or the next decay step is picked up on the
+    next request without querying the database in between.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._articles = []
+        self._html = None
+
+    def invalidate(self):
+        with self._lock:
+            self._version = None
+            self._html = None
+
+    def articles(self):
+        now = ranking_time()
+        version = (current_version(), now)
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._articles = load_front_page(now=now)
+                    self._html = None
+                    self._version = version
+        return self._articles
+
+    def render(self, user):
+        articles = self.articles()
+        return render_template(
+            "index.html", top_article=articles[0] if articles else None, articles=articles, user=user,
+            live=current_app.config["LIVE_UPDATES"],
+        )
+
+    def anonymous_html(self, user):
+        articles = self.articles()
+        html = self._html
+        if html is None:
+            html = self.render(user)
+            with self._lock:
+                if self._articles is articles:
+                    self._html = html
+        return html
+
+
+front_page = FrontPageCache()
@@ -0,0 +1,9 @@
+# Loaded automatically by gunicorn when started from the project directory.
+
+
+def post_worker_init(worker):
+    """Joins the scheduler leader election as soon as each worker has loaded the app."""
+    import scheduler
+    from app import app
+
+    scheduler.ensure_started(app)
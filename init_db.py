@@ -1,6 +1,33 @@
+from flask_migrate import stamp, upgrade
+from sqlalchemy import inspect, text
+
 from app import app, db
+from retention import enable_incremental_vacuum
+from search import ensure_search_index
+
+# Revision matching the tables the old db.create_all()-only init_db.py built
+BASELINE_REVISION = "ce5041ddb0a8"
+
+
+def migration_revision(engine):
+    """The stamped Alembic revision, or None when the database was never stamped."""
+    if not inspect(engine).has_table("alembic_version"):
+        return None
+    with engine.connect() as connection:
+        return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
 
-# Ensure database tables are created
+# A fresh database gets every table at once and is stamped as current; an existing one
+# (including a news.db from before the scoring and polling columns) is migrated forward.
 with app.app_context():
-    db.create_all()
+    if inspect(db.engine).has_table("article"):
+        if migration_revision(db.engine) is None:
+            stamp(revision=BASELINE_REVISION)
+        upgrade()
+    else:
+        db.create_all()
+        stamp()
+    ensure_search_index(db.engine)
+    if enable_incremental_vacuum(db.engine):
+        print("🧹 Switched the database to incremental auto-vacuum")
     print("✅ Database initialized successfully!")
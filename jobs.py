@@ -0,0 +1,142 @@
+import logging
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, UTC
+
+from scheduler import LeaderLock
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """A single background run, tracked by id so clients can poll or follow its events."""
+
+    def __init__(self, name):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.status = "queued"
+        self.created_at = datetime.now(UTC)
+        self.started_at = None
+        self.finished_at = None
+        self.error = None
+        self.events = deque(maxlen=200)
+        self.future = None
+        self.lock = None
+
+    @property
+    def active(self):
+        return self.status in ("queued", "running")
+
+    def to_dict(self, include_events=False):
+        data = {
+            "id": self.id,
+            "name": self.name,
+            "status": self.status,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "error": self.error,
+        }
+        if include_events:
+            data["events"] = list(self.events)
+        return data
+
+
+class JobManager:
+    """Runs jobs on a small thread pool inside the already-warm web process.
+
+    Jobs are de-duplicated by name: submitting while a job of the same name is queued or
+    running returns that job instead of starting another. With `lock_path` (name -> file),
+    each job also holds an flock on that file while queued and running, so other processes
+    (more gunicorn workers, the standalone scheduler) can't run it at the same time either.
+    Status changes and progress events are pushed through `emit` (socketio.emit) as "job"
+    and "log" messages.
+    """
+
+    def __init__(self, emit=None, max_workers=1, history=50, lock_path=None):
+        self._emit = emit
+        self._lock_path = lock_path
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._active = {}
+        self._history = history
+
+    def submit(self, name, func, *args, **kwargs):
+        """Queues `func(*args, progress=..., **kwargs)`; returns (job, created).
+
+        job is None when another process is already running a job with this name.
+        """
+        with self._lock:
+            running = self._active.get(name)
+            if running and running.active:
+                return running, False
+
+            lock = None
+            if self._lock_path:
+                lock = LeaderLock(self._lock_path(name))
+                if not lock.acquire():
+                    return None, False
+
+            job = Job(name)
+            job.lock = lock
+            self._jobs[job.id] = job
+            self._active[name] = job
+            self._trim()
+            job.future = self._executor.submit(self._run, job, func, args, kwargs)
+        self._publish(job, message=f"Job {name} queued ({job.id})")
+        return job, True
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def recent(self):
+        return sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+    def _run(self, job, func, args, kwargs):
+        job.status = "running"
+        job.started_at = datetime.now(UTC)
+        self._publish(job, message=f"Job {job.name} started")
+
+        def progress(message=None, **data):
+            event = {"time": datetime.now(UTC).isoformat(), "message": message, **data}
+            job.events.append(event)
+            self._send("job_progress", {"job_id": job.id, "name": job.name, **event})
+            if message:
+                self._send("log", {"message": message})
+
+        try:
+            func(*args, progress=progress, **kwargs)
+            job.status = "succeeded"
+        except Exception as e:
+            logger.exception(f"Job {job.name} ({job.id}) failed")
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.now(UTC)
+            with self._lock:
+                if self._active.get(job.name) is job:
+                    del self._active[job.name]
+                if job.lock:
+                    job.lock.release()
+            outcome = f"failed: {job.error}" if job.error else "completed successfully"
+            self._publish(job, message=f"Job {job.name} {outcome}")
+
+    def _trim(self):
+        finished = [job for job in self.recent() if not job.active]
+        for job in finished[self._history:]:
+            del self._jobs[job.id]
+
+    def _publish(self, job, message=None):
+        self._send("job", job.to_dict())
+        if message:
+            self._send("log", {"message": message})
+
+    def _send(self, event, payload):
+        if self._emit:
+            try:
+                self._emit(event, payload)
+            except Exception:
+                logger.exception(f"Failed to emit {event} event")
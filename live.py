@@ -0,0 +1,95 @@
+import threading
+import time
+
+from frontpage import front_page, version_listeners
+
+LIVE_ROOM = "front_page"
+
+
+def diff_front_pages(old_articles, new_articles):
+    """Compact change set between two front page snapshots.
+
+    Returns None when nothing changed, otherwise a dict with the full rows of articles that
+    appeared, the ids that dropped off, and the new id order when the ranking moved.
+    """
+    old_ids = [article["id"] for article in old_articles]
+    new_ids = [article["id"] for article in new_articles]
+    if old_ids == new_ids:
+        return None
+
+    known = set(old_ids)
+    current = set(new_ids)
+    return {
+        "added": [article for article in new_articles if article["id"] not in known],
+        "removed": [article_id for article_id in old_ids if article_id not in current],
+        "order": new_ids,
+    }
+
+
+class LiveFrontPage:
+    """Pushes front page changes to subscribed browsers over Socket.IO.
+
+    A single background task watches the front page cache. It is woken right away by
+    bump_version in this process and otherwise checks every LIVE_POLL_SECONDS, which picks
+    up scrapes from other processes and the ranking window rolling over. After a wake-up it
+    waits LIVE_PUSH_MIN_INTERVAL before diffing, so a burst of commits reaches clients as one
+    diff.
+    """
+
+    def __init__(self, socketio, app):
+        self._socketio = socketio
+        self._app = app
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._subscribers = set()
+        self._snapshot = None
+        self._started = False
+        version_listeners.append(self._wake.set)
+
+    def subscribe(self, sid, known_ids=None):
+        """Registers a client and brings it up to date from the ids its page was rendered with."""
+        with self._lock:
+            self._subscribers.add(sid)
+            if not self._started:
+                self._started = True
+                self._socketio.start_background_task(self._run)
+
+        articles = front_page.articles()
+        if self._snapshot is None:
+            self._snapshot = articles
+        known = [{"id": article_id} for article_id in known_ids or []]
+        diff = diff_front_pages(known, articles)
+        if diff:
+            self._socketio.emit("front_page_diff", diff, to=sid)
+
+    def unsubscribe(self, sid):
+        with self._lock:
+            self._subscribers.discard(sid)
+
+    def _run(self):
+        last_push = 0.0
+        while True:
+            woken = self._wake.wait(timeout=self._app.config["LIVE_POLL_SECONDS"])
+
+            # Coalesce: after a bump, let the rest of the burst land before diffing
+            interval = self._app.config["LIVE_PUSH_MIN_INTERVAL"]
+            wait = interval if woken else last_push + interval - time.monotonic()
+            if wait > 0:
+                self._socketio.sleep(wait)
+            self._wake.clear()
+            if not self._subscribers:
+                self._snapshot = None
+                continue
+
+            try:
+                with self._app.app_context():
+                    articles = front_page.articles()
+            except Exception as e:
+                print(f"⚠️ Live front page refresh failed: {e}")
+                continue
+
+            diff = diff_front_pages(self._snapshot or [], articles)
+            self._snapshot = articles
+            if diff:
+                self._socketio.emit("front_page_diff", diff, to=LIVE_ROOM)
+                last_push = time.monotonic()
@@ -0,0 +1,79 @@
+import asyncio
+import hashlib
+import json
+import re
+
+from fetcher import create_client
+
+PROMPT = """Rate how important each news headline is for a general audience, from 0 (trivial) to 10 (major world event).
+Reply with JSON only, in the form {{"scores": [<one integer per headline, in order>]}}.
+
+{headlines}"""
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def title_hash(title):
+    """Cache key for a headline: case and whitespace differences don't matter."""
+    normalized = _WHITESPACE.sub(" ", title.strip().lower())
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+def build_prompt(titles):
+    return PROMPT.format(headlines="\n".join(f"{i}. {title}" for i, title in enumerate(titles, 1)))
+
+
+def parse_scores(text, expected):
+    """Extracts one 0-10 score per headline from the model's reply; raises ValueError otherwise."""
+    scores = json.loads(text)
+    if isinstance(scores, dict):
+        scores = scores.get("scores")
+    if not isinstance(scores, list) or len(scores) != expected:
+        raise ValueError(f"expected {expected} scores, got {scores!r:.100}")
+    return [min(max(float(score), 0.0), 10.0) for score in scores]
+
+
+async def score_batch(client, base_url, model, titles, semaphore):
+    """Scores one batch of headlines with Ollama's /api/generate."""
+    async with semaphore:
+        response = await client.post(f"{base_url}/api/generate", json={
+            "model": model,
+            "prompt": build_prompt(titles),
+            "stream": False,
+            "format": "json",
+            "options": {"temperature": 0},
+        })
+        response.raise_for_status()
+        return parse_scores(response.json()["response"], len(titles))
+
+
+async def score_titles(base_url, model, titles, batch_size=20, max_concurrency=2, timeout=30, deadline=None):
+    """Scores headlines in batches with bounded concurrency. Returns {title: score}.
+
+    Batches that fail, time out or run past `deadline` seconds are left out, so callers keep
+    the keyword score for those titles.
+    """
+    titles = list(dict.fromkeys(titles))
+    if not titles:
+        return {}
+    batches = [titles[i:i + batch_size] for i in range(0, len(titles), batch_size)]
+    semaphore = asyncio.Semaphore(max_concurrency)
+    scores = {}
+
+    async with create_client(max_connections=max_concurrency, timeout=timeout) as client:
+        tasks = [asyncio.create_task(score_batch(client, base_url.rstrip("/"), model, batch, semaphore)) for batch in batches]
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        if pending:
+            print(f"⏱️ LLM scoring deadline reached, {len(pending)} batches fall back to keyword scores")
+
+        for batch, task in zip(batches, tasks):
+            if task not in done:
+                continue
+            if task.exception():
+                print(f"⚠️ LLM scoring batch failed: {task.exception()!r}")
+                continue
+            scores.update(zip(batch, task.result()))
+    return scores
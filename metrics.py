@@ -0,0 +1,62 @@
+from sqlalchemy import func
+from models import NewsSource, ScrapeRun, SourceScrapeMetric
+
+SOURCE_GAUGES = (
+    ("fetch_seconds", "Time spent downloading the feed in the last run."),
+    ("parse_seconds", "Time spent parsing the feed in the last run."),
+    ("bytes_received", "Bytes downloaded for the feed in the last run."),
+    ("entries", "Entries seen in the feed in the last run."),
+    ("new_articles", "New articles stored from the feed in the last run."),
+    ("rescored_articles", "Existing articles re-scored from the feed in the last run."),
+    ("image_fetches", "Article pages fetched to resolve images in the last run."),
+    ("http_status", "HTTP status of the last fetch (0 when the request failed)."),
+)
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def latest_source_metrics():
+    """Returns each source's most recent measurement joined with its name."""
+    latest = SourceScrapeMetric.query.with_entities(
+        func.max(SourceScrapeMetric.id).label("id")
+    ).group_by(SourceScrapeMetric.source_id).subquery()
+
+    return SourceScrapeMetric.query.with_entities(SourceScrapeMetric, NewsSource.name).join(
+        latest, SourceScrapeMetric.id == latest.c.id
+    ).outerjoin(NewsSource, NewsSource.id == SourceScrapeMetric.source_id).all()
+
+
+def render_prometheus():
+    """Renders scrape telemetry in the Prometheus text exposition format."""
+    lines = []
+
+    def gauge(name, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for labels, value in samples:
+            label_text = ",".join(f'{key}="{escape_label(val)}"' for key, val in labels.items())
+            lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+    last_run = ScrapeRun.query.filter(ScrapeRun.finished_at.isnot(None)).order_by(ScrapeRun.id.desc()).first()
+    # Retention prunes old runs, so this count can go down: a gauge, not a counter
+    gauge("drudge_scrape_runs_retained", "Scrape runs currently kept in the history table.",
+          [({}, ScrapeRun.query.count())])
+    if last_run:
+        gauge("drudge_scrape_last_run_duration_seconds", "Wall time of the last completed scrape run.",
+              [({}, last_run.duration_seconds or 0)])
+        gauge("drudge_scrape_last_run_timestamp_seconds", "Start time of the last completed scrape run.",
+              [({}, last_run.started_at.timestamp())])
+        gauge("drudge_scrape_last_run_new_articles", "New articles stored by the last completed run.",
+              [({}, last_run.new_articles)])
+
+    rows = latest_source_metrics()
+    for field, help_text in SOURCE_GAUGES:
+        samples = []
+        for metric, name in rows:
+            labels = {"source_id": metric.source_id, "source": name or "", "status": metric.status}
+            samples.append((labels, getattr(metric, field) or 0))
+        gauge(f"drudge_source_{field}", help_text, samples)
+
+    return "\n".join(lines) + "\n"
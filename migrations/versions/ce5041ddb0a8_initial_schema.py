@@ -0,0 +1,65 @@
+"""Initial schema
+
+Revision ID: ce5041ddb0a8
+Revises:
+Create Date: 2025-02-01 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ce5041ddb0a8'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('news_source',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('url', sa.String(length=500), nullable=False),
+    sa.Column('scraping_type', sa.String(length=50), nullable=False),
+    sa.Column('category', sa.String(length=100), nullable=True),
+    sa.Column('enabled', sa.Boolean(), server_default=sa.text('1'), nullable=False),
+    sa.Column('scrape_status', sa.String(length=255), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('url')
+    )
+    op.create_table('ollama_settings',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('enabled', sa.Boolean(), nullable=False),
+    sa.Column('selected_model', sa.String(length=255), nullable=True),
+    sa.Column('base_url', sa.String(length=255), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('user',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('username', sa.String(length=80), nullable=False),
+    sa.Column('password', sa.String(length=255), nullable=False),
+    sa.Column('is_admin', sa.Boolean(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('username')
+    )
+    op.create_table('article',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=512), nullable=False),
+    sa.Column('url', sa.String(length=1024), nullable=False),
+    sa.Column('source_id', sa.Integer(), nullable=False),
+    sa.Column('timestamp', sa.DateTime(), nullable=False),
+    sa.Column('image_url', sa.String(length=1024), nullable=True),
+    sa.Column('score', sa.Integer(), nullable=False),
+    sa.Column('rss_position', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['source_id'], ['news_source.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('url')
+    )
+
+
+def downgrade():
+    op.drop_table('article')
+    op.drop_table('user')
+    op.drop_table('ollama_settings')
+    op.drop_table('news_source')
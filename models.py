@@ -3,6 +3,7 @@ from flask_login import UserMixin
 from datetime import datetime
 import pytz
 from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import case
 from sqlalchemy.exc import IntegrityError
 from flask import jsonify, request
 
@@ -42,6 +43,26 @@ class FeedService:
             print(f"Error occurred: {e}")
             return jsonify({"error": "An error occurred: " + str(e)}), 500
 
+def hours_since(timestamp):
+    """Whole hours elapsed since a (possibly naive, UTC) timestamp."""
+    if not timestamp:
+        return 9999
+    utc_now = datetime.utcnow().replace(tzinfo=pytz.utc)
+    timestamp_aware = timestamp if timestamp.tzinfo else timestamp.replace(tzinfo=pytz.utc)
+    return (utc_now - timestamp_aware).total_seconds() // 3600
+
+def epoch_hours(timestamp):
+    """Hours since the Unix epoch for a (possibly naive, UTC) timestamp."""
+    timestamp_aware = timestamp if timestamp.tzinfo else timestamp.replace(tzinfo=pytz.utc)
+    return timestamp_aware.timestamp() / 3600
+
+def score_at(base_score, decay_rate, score_cap, age_hours):
+    """Applies the age penalty and clamps to a static score, exactly as the ranking does."""
+    score = base_score - max(0, age_hours) * decay_rate
+    if score_cap is not None:
+        score = min(score, score_cap)
+    return max(0, score)
+
 class NewsSource(db.Model):
     __tablename__ = "news_source"
     id = db.Column(db.Integer, primary_key=True)
@@ -51,6 +72,17 @@ class NewsSource(db.Model):
     category = db.Column(db.String(100), nullable=True)
     enabled = db.Column(db.Boolean, default=True, nullable=False)
     scrape_status = db.Column(db.String(255), nullable=True)
+    etag = db.Column(db.String(255), nullable=True)
+    last_modified = db.Column(db.String(64), nullable=True)
+    content_hash = db.Column(db.String(64), nullable=True)
+    # Adaptive polling: learned publish rate (new articles/hour) and the resulting schedule
+    publish_rate = db.Column(db.Float, nullable=True)
+    poll_interval_minutes = db.Column(db.Float, nullable=True)
+    last_polled_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    next_poll_at = db.Column(db.DateTime(timezone=True), nullable=True, index=True)
+    # Failure tracking for backoff and automatic quarantine
+    consecutive_failures = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    last_failure_at = db.Column(db.DateTime(timezone=True), nullable=True)
 
 class Article(db.Model):
     __tablename__ = "article"
@@ -58,19 +90,118 @@ class Article(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(512), nullable=False)
     url = db.Column(db.String(1024), unique=True, nullable=False)
-    image_url = db.Column(db.String(1024), nullable=True)
+    image_url = db.Column(db.String(1024), nullable=True, index=True)
     source_id = db.Column(db.Integer, db.ForeignKey("news_source.id"), nullable=False)
-    timestamp = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(pytz.utc), nullable=False)
+    timestamp = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(pytz.utc), nullable=False, index=True)
     score = db.Column(db.Integer, default=0, nullable=False)
     rss_position = db.Column(db.Integer, nullable=True)
 
+    keyword_mask = db.Column(db.Integer, nullable=True)  # bitmask of matched keyword categories
+
+    # Static score components; the live score is derived from these at query time.
+    engagement = db.Column(db.Float, nullable=True)  # points/comments bonus from the feed entry
+    base_score = db.Column(db.Float, nullable=True)  # keywords + combo + source boost + engagement
+    decay_rate = db.Column(db.Float, nullable=True)  # points lost per hour of age
+    score_cap = db.Column(db.Float, nullable=True)  # upper clamp (fluff), None when unclamped
+    decay_origin = db.Column(db.Float, nullable=True)  # base_score + decay_rate * epoch_hours(timestamp)
+
+    # Near-duplicate clustering: id of the story's first article, and the multi-source boost
+    # currently included in base_score.
+    story_id = db.Column(db.Integer, nullable=True, index=True)
+    story_boost = db.Column(db.Float, nullable=True)
+    # Optional LLM importance rating (0-10) blended into base_score; null when not rated
+    llm_score = db.Column(db.Float, nullable=True)
+
     def age_in_hours(self):
         """Calculates the article's age in hours, considering timezone awareness."""
-        if not self.timestamp:
-            return 9999
-        utc_now = datetime.utcnow().replace(tzinfo=pytz.utc)
-        timestamp_aware = self.timestamp if self.timestamp.tzinfo else self.timestamp.replace(tzinfo=pytz.utc)
-        return (utc_now - timestamp_aware).total_seconds() // 3600
+        return hours_since(self.timestamp)
+
+    def set_score_components(self, base_score, decay_rate, score_cap):
+        """Stores the static score parts and refreshes the `score` snapshot from them."""
+        self.base_score = base_score
+        self.decay_rate = decay_rate
+        self.score_cap = score_cap
+        self.decay_origin = base_score + decay_rate * epoch_hours(self.timestamp)
+        self.score = score_at(base_score, decay_rate, score_cap, self.age_in_hours())
+
+    @classmethod
+    def rank_at(cls, now):
+        """SQL expression for each article's live score at `now`.
+
+        base_score - decay_rate * age is rewritten as decay_origin - decay_rate * now, so the
+        expression is plain arithmetic on stored columns and works on any database. Rows
+        written before the components existed fall back to their stored score.
+        """
+        live = cls.decay_origin - cls.decay_rate * epoch_hours(now)
+        capped = case((cls.score_cap.isnot(None) & (live > cls.score_cap), cls.score_cap), else_=live)
+        floored = case((capped < 0, 0.0), else_=capped)
+        return case((cls.decay_origin.is_(None), cls.score), else_=floored)
+
+class StoryBand(db.Model):
+    """LSH bucket membership of an article's headline MinHash, used to find near-duplicates."""
+    __tablename__ = "story_band"
+
+    id = db.Column(db.Integer, primary_key=True)
+    band_key = db.Column(db.String(24), nullable=False, index=True)
+    article_id = db.Column(db.Integer, nullable=False, index=True)
+
+class HeadlineScore(db.Model):
+    """Cached LLM importance rating of a headline, keyed by a hash of the normalized title."""
+    __tablename__ = "headline_score"
+
+    id = db.Column(db.Integer, primary_key=True)
+    title_hash = db.Column(db.String(64), unique=True, nullable=False)
+    model = db.Column(db.String(255), nullable=False)
+    score = db.Column(db.Float, nullable=False)
+    scored_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(pytz.utc), nullable=False, index=True)
+
+class ImageCache(db.Model):
+    """Remembers the outcome of resolving an article page's preview image."""
+    __tablename__ = "image_cache"
+
+    id = db.Column(db.Integer, primary_key=True)
+    article_url = db.Column(db.String(1024), unique=True, nullable=False)
+    domain = db.Column(db.String(255), nullable=False, index=True)
+    image_url = db.Column(db.String(1024), nullable=True)
+    status = db.Column(db.String(16), nullable=False)  # "found", "missing" or "error"
+    checked_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(pytz.utc), nullable=False, index=True)
+
+    def is_fresh(self, ttls, now=None):
+        """True while this entry is younger than the TTL configured for its status."""
+        now = now or datetime.now(pytz.utc)
+        checked_at = self.checked_at if self.checked_at.tzinfo else self.checked_at.replace(tzinfo=pytz.utc)
+        return now - checked_at < ttls[self.status]
+
+class ScrapeRun(db.Model):
+    """One execution of the scraper, with its overall timing."""
+    __tablename__ = "scrape_run"
+
+    id = db.Column(db.Integer, primary_key=True)
+    started_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(pytz.utc), nullable=False, index=True)
+    finished_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    duration_seconds = db.Column(db.Float, nullable=True)
+    sources = db.Column(db.Integer, default=0, nullable=False)
+    new_articles = db.Column(db.Integer, default=0, nullable=False)
+    rescored_articles = db.Column(db.Integer, default=0, nullable=False)
+    image_fetches = db.Column(db.Integer, default=0, nullable=False)
+
+class SourceScrapeMetric(db.Model):
+    """Per-source measurements taken during a scrape run."""
+    __tablename__ = "source_scrape_metric"
+
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.Integer, db.ForeignKey("scrape_run.id"), nullable=False, index=True)
+    source_id = db.Column(db.Integer, nullable=False, index=True)  # kept even if the source is deleted
+    recorded_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(pytz.utc), nullable=False)
+    status = db.Column(db.String(16), nullable=False)  # success, unchanged, empty or error
+    http_status = db.Column(db.Integer, nullable=True)
+    fetch_seconds = db.Column(db.Float, default=0, nullable=False)
+    parse_seconds = db.Column(db.Float, default=0, nullable=False)
+    bytes_received = db.Column(db.Integer, default=0, nullable=False)
+    entries = db.Column(db.Integer, default=0, nullable=False)
+    new_articles = db.Column(db.Integer, default=0, nullable=False)
+    rescored_articles = db.Column(db.Integer, default=0, nullable=False)
+    image_fetches = db.Column(db.Integer, default=0, nullable=False)
 
 class User(db.Model, UserMixin):
     __tablename__ = "user"
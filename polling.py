@@ -0,0 +1,75 @@
+from datetime import timedelta
+import pytz
+
+
+def as_utc(timestamp):
+    return timestamp if timestamp.tzinfo else timestamp.replace(tzinfo=pytz.utc)
+
+
+def poll_interval_minutes(publish_rate, config):
+    """Minutes to wait so that roughly POLL_TARGET_NEW_PER_POLL new articles are waiting.
+
+    Busy wires end up near POLL_MIN_MINUTES, dormant blogs at POLL_MAX_MINUTES.
+    """
+    if not publish_rate:
+        return config["POLL_MAX_MINUTES"]
+    minutes = config["POLL_TARGET_NEW_PER_POLL"] / publish_rate * 60
+    return min(max(minutes, config["POLL_MIN_MINUTES"]), config["POLL_MAX_MINUTES"])
+
+
+def update_poll_schedule(source, new_articles, now, config):
+    """Learns a source's publish rate from the new articles found and schedules its next poll.
+
+    The rate (articles/hour) is an exponentially weighted average of new_articles divided by
+    the time since the previous poll. The first poll only seeds the timestamps, since the
+    whole backlog shows up as "new" and says nothing about the publish rate. A successful
+    poll also clears any failure backoff.
+    """
+    source.consecutive_failures = 0
+
+    if source.last_polled_at is None:
+        interval = config["POLL_DEFAULT_MINUTES"]
+    else:
+        elapsed_hours = (now - as_utc(source.last_polled_at)).total_seconds() / 3600
+        if elapsed_hours > 0:
+            sample = new_articles / elapsed_hours
+            alpha = config["POLL_RATE_SMOOTHING"]
+            previous = source.publish_rate if source.publish_rate is not None else sample
+            source.publish_rate = alpha * sample + (1 - alpha) * previous
+        interval = poll_interval_minutes(source.publish_rate, config)
+
+    source.last_polled_at = now
+    source.poll_interval_minutes = interval
+    source.next_poll_at = now + timedelta(minutes=interval)
+
+
+def backoff_minutes(failures, config):
+    """Exponential backoff: base, 2x base, 4x base, ... capped at FEED_BACKOFF_MAX_MINUTES."""
+    minutes = config["FEED_BACKOFF_BASE_MINUTES"] * 2 ** max(0, failures - 1)
+    return min(minutes, config["FEED_BACKOFF_MAX_MINUTES"])
+
+
+def record_failure(source, error, now, config):
+    """Counts a failed fetch, pushes the next attempt out, and quarantines chronic failures.
+
+    Returns True when the source has just been disabled. Nothing is learned about the
+    publish rate; last_polled_at is left alone so the next success measures the full gap.
+    """
+    source.consecutive_failures = (source.consecutive_failures or 0) + 1
+    source.last_failure_at = now
+
+    if source.consecutive_failures >= config["FEED_QUARANTINE_AFTER"]:
+        source.enabled = False
+        source.next_poll_at = None
+        source.scrape_status = f"Disabled after {source.consecutive_failures} failures: {error}"[:255]
+        return True
+
+    delay = backoff_minutes(source.consecutive_failures, config)
+    source.next_poll_at = now + timedelta(minutes=delay)
+    source.scrape_status = f"Error ({source.consecutive_failures}x, retry in {delay:.0f}m): {error}"[:255]
+    return False
+
+
+def in_backoff(source, now):
+    """True while a failing source is waiting out its backoff delay."""
+    return bool(source.consecutive_failures) and source.next_poll_at is not None and as_utc(source.next_poll_at) > now
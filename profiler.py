@@ -0,0 +1,137 @@
+import contextlib
+import contextvars
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, UTC
+
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_active = contextvars.ContextVar("sql_profiles", default=())
+_recent = deque(maxlen=100)
+_lock = threading.Lock()
+_settings = {"enabled": False, "slowest": 5, "repeat_threshold": 5}
+
+
+class QueryProfile:
+    """Queries issued while one request or scraper phase was running."""
+
+    def __init__(self, name):
+        self.name = name
+        self.started_at = datetime.now(UTC)
+        self.queries = 0
+        self.seconds = 0.0
+        self.statements = Counter()
+        self.slowest = []  # (seconds, statement), longest first
+
+    def record(self, statement, seconds):
+        self.queries += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+        if len(self.slowest) < _settings["slowest"] or seconds > self.slowest[-1][0]:
+            self.slowest.append((seconds, statement))
+            self.slowest.sort(key=lambda item: item[0], reverse=True)
+            del self.slowest[_settings["slowest"]:]
+
+    def repeated(self):
+        """Identical statements run at least repeat_threshold times: the N+1 pattern."""
+        return {
+            statement: count for statement, count in self.statements.most_common()
+            if count >= _settings["repeat_threshold"]
+        }
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "started_at": self.started_at.isoformat(),
+            "queries": self.queries,
+            "db_ms": round(self.seconds * 1000, 2),
+            "slowest": [{"ms": round(seconds * 1000, 2), "statement": statement} for seconds, statement in self.slowest],
+            "repeated": [{"count": count, "statement": statement} for statement, count in self.repeated().items()],
+        }
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    if _active.get():
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    profiles = _active.get()
+    if not profiles or not conn.info.get("query_started"):
+        return
+    seconds = time.perf_counter() - conn.info["query_started"].pop()
+    for profile in profiles:
+        profile.record(statement, seconds)
+
+
+def start(name):
+    """Begins collecting into a new profile (nested inside any active one). Returns a token for finish()."""
+    profile = QueryProfile(name)
+    return profile, _active.set(_active.get() + (profile,))
+
+
+def finish(token):
+    """Stops collecting, keeps the profile for /debug/sql and warns about N+1 patterns."""
+    profile, reset_token = token
+    _active.reset(reset_token)
+    with _lock:
+        _recent.append(profile)
+    for statement, count in profile.repeated().items():
+        print(f"⚠️ {profile.name}: same query ran {count} times (possible N+1): {statement[:200]}")
+    return profile
+
+
+@contextlib.contextmanager
+def sql_profile(name):
+    """Profiles the queries of a block (e.g. a scraper phase); does nothing unless SQL_PROFILING is on."""
+    if not _settings["enabled"]:
+        yield None
+        return
+    token = start(name)
+    try:
+        yield token[0]
+    finally:
+        profile = finish(token)
+        print(f"🧮 {name}: {profile.queries} queries, {profile.seconds * 1000:.1f} ms in the database")
+
+
+def recent_profiles():
+    with _lock:
+        return [profile.to_dict() for profile in reversed(_recent)]
+
+
+def init_profiler(app):
+    """Profiles every request when SQL_PROFILING is set, reporting totals in response headers."""
+    _settings.update(
+        enabled=app.config["SQL_PROFILING"],
+        slowest=app.config["SQL_PROFILE_SLOWEST"],
+        repeat_threshold=app.config["SQL_PROFILE_REPEAT_THRESHOLD"],
+    )
+    if not _settings["enabled"]:
+        return
+
+    @app.before_request
+    def start_request_profile():
+        g.sql_profile = start(f"{request.method} {request.url_rule.rule if request.url_rule else request.path}")
+
+    @app.after_request
+    def add_profile_headers(response):
+        token = g.pop("sql_profile", None)
+        if token:
+            profile = finish(token)
+            response.headers["X-SQL-Queries"] = str(profile.queries)
+            response.headers["X-SQL-Time-Ms"] = f"{profile.seconds * 1000:.2f}"
+            response.headers["X-SQL-Repeated"] = str(max(profile.statements.values(), default=0))
+        return response
+
+    @app.teardown_request
+    def finish_failed_request_profile(error=None):
+        # after_request is skipped when the view raised; don't leave the profile active
+        token = g.pop("sql_profile", None)
+        if token:
+            finish(token)
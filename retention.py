@@ -0,0 +1,109 @@
+import gzip
+import json
+import os
+from datetime import datetime, UTC
+
+from sqlalchemy import text
+
+from models import Article, HeadlineScore, ImageCache, ScrapeRun, SourceScrapeMetric, StoryBand
+
+ARCHIVE_COLUMNS = (
+    Article.id, Article.title, Article.url, Article.image_url, Article.source_id,
+    Article.timestamp, Article.score, Article.base_score,
+)
+
+
+def archive_rows(archive_dir, rows, now):
+    """Appends expired articles to a gzip-compressed JSON Lines file per day.
+
+    gzip files can be appended to as extra members, so each chunk is written and closed
+    immediately and a crash never leaves a partially written archive behind.
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"articles-{now:%Y%m%d}.jsonl.gz")
+    with gzip.open(path, "at", encoding="utf-8") as archive:
+        for row in rows:
+            record = row._asdict()
+            record["timestamp"] = record["timestamp"].isoformat() if record["timestamp"] else None
+            record["archived_at"] = now.isoformat()
+            archive.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return path
+
+
+def purge_articles(session, condition, chunk_size, archive_dir=None, now=None):
+    """Deletes articles matching `condition` in id-ordered chunks, committing after each.
+
+    Each chunk holds the write lock only briefly, so web readers and the scraper can
+    interleave with a large cleanup. Returns the number of rows deleted.
+    """
+    now = now or datetime.now(UTC)
+    deleted = 0
+    last_id = 0
+    while True:
+        columns = ARCHIVE_COLUMNS if archive_dir else (Article.id,)
+        rows = session.query(*columns).filter(condition, Article.id > last_id).order_by(Article.id).limit(chunk_size).all()
+        if not rows:
+            break
+
+        if archive_dir:
+            archive_rows(archive_dir, rows, now)
+        ids = [row.id for row in rows]
+        session.query(StoryBand).filter(StoryBand.article_id.in_(ids)).delete(synchronize_session=False)
+        session.query(Article).filter(Article.id.in_(ids)).delete(synchronize_session=False)
+        session.commit()
+        deleted += len(ids)
+        last_id = ids[-1]
+    return deleted
+
+
+def purge_history(session, metrics_cutoff, image_cache_cutoff, headline_cutoff):
+    """Drops scrape telemetry, image cache and headline rating rows that have outlived their retention."""
+    expired_runs = session.query(ScrapeRun.id).filter(ScrapeRun.started_at < metrics_cutoff).scalar_subquery()
+    session.query(SourceScrapeMetric).filter(SourceScrapeMetric.run_id.in_(expired_runs)).delete(synchronize_session=False)
+    runs = session.query(ScrapeRun).filter(ScrapeRun.started_at < metrics_cutoff).delete(synchronize_session=False)
+    images = session.query(ImageCache).filter(ImageCache.checked_at < image_cache_cutoff).delete(synchronize_session=False)
+    headlines = session.query(HeadlineScore).filter(HeadlineScore.scored_at < headline_cutoff).delete(synchronize_session=False)
+    session.commit()
+    return runs, images, headlines
+
+
+def enable_incremental_vacuum(engine):
+    """Switches an SQLite database to auto_vacuum=INCREMENTAL so cleanup can release space.
+
+    An existing database only picks the setting up through a full VACUUM, which rewrites the
+    whole file and blocks writers while it runs, so this is a one-off step run by init_db.py
+    rather than part of routine cleanup. Returns True when the database was converted.
+    """
+    if engine.dialect.name != "sqlite":
+        return False
+
+    with engine.connect() as connection:
+        connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+        if connection.execute(text("PRAGMA auto_vacuum")).scalar() == 2:
+            return False
+        connection.execute(text("PRAGMA auto_vacuum=INCREMENTAL"))
+        connection.execute(text("VACUUM"))
+    return True
+
+
+def reclaim_space(engine, pages):
+    """Returns free pages to the filesystem so news.db does not only ever grow.
+
+    Needs auto_vacuum=INCREMENTAL (see enable_incremental_vacuum); other databases are left
+    alone. The WAL is checkpointed and truncated afterwards so it does not keep the freed
+    space either. Returns the number of pages released, or None when the database is not
+    SQLite or not in incremental mode.
+    """
+    if engine.dialect.name != "sqlite":
+        return None
+
+    with engine.connect() as connection:
+        connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+        if connection.execute(text("PRAGMA auto_vacuum")).scalar() != 2:
+            return None
+
+        free_before = connection.execute(text("PRAGMA freelist_count")).scalar()
+        connection.execute(text(f"PRAGMA incremental_vacuum({int(pages)})"))
+        free_after = connection.execute(text("PRAGMA freelist_count")).scalar()
+        connection.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+    return free_before - free_after
@@ -0,0 +1,138 @@
+import atexit
+import fcntl
+import logging
+import os
+import threading
+import time
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.schedulers.blocking import BlockingScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderLock:
+    """Non-blocking exclusive lock on a file, used to elect one scheduling process.
+
+    The OS drops the lock when the holding process exits, so a standby process can take
+    over after the leader dies without any stale-lock cleanup.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    @property
+    def held(self):
+        return self._file is not None
+
+    def acquire(self):
+        if self._file:
+            return True
+        lock_file = open(self.path, "a+")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        self._file = lock_file
+        return True
+
+    def release(self):
+        if self._file:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+
+def add_jobs(scheduler):
+    """Registers the periodic jobs; shared by the embedded and standalone schedulers."""
+    from app import app, run_scraper, run_maintenance
+
+    if app.config["ADAPTIVE_POLLING"]:
+        # Frequent tick that only fetches sources whose learned poll interval has elapsed;
+        # rescoring and cleanup keep their 3-hour cadence.
+        scheduler.add_job(func=run_scraper, trigger='interval', minutes=app.config["SCRAPER_TICK_MINUTES"],
+                          kwargs={"due_only": True, "maintenance": False}, id="run_scraper",
+                          max_instances=1, coalesce=True, replace_existing=True)
+        scheduler.add_job(func=run_maintenance, trigger='cron', hour='*/3', id="run_maintenance",
+                          max_instances=1, coalesce=True, replace_existing=True)
+        return
+
+    # Scrape every 3 hours; never overlap runs and collapse missed ones into one.
+    scheduler.add_job(func=run_scraper, trigger='cron', hour='*/3', id="run_scraper",
+                      max_instances=1, coalesce=True, replace_existing=True)
+
+
+_lock = None
+_scheduler = None
+_started = threading.Lock()
+
+
+def ensure_started(app):
+    """Starts the embedded scheduler in this process if it wins the leader election.
+
+    Called once per server process, from gunicorn's post_worker_init hook (gunicorn.conf.py)
+    or `python app.py`, rather than at import time, so scripts that import `app`
+    (scraper.py, seed.py, init_db.py) never schedule anything. Processes that lose the
+    election keep retrying in the background and take over if the leader exits.
+    """
+    global _lock
+    if _lock is not None or app.config["SCHEDULER_MODE"] != "embedded":
+        return
+    with _started:
+        if _lock is not None:
+            return
+        _lock = LeaderLock(app.config["SCHEDULER_LOCK_FILE"])
+    _try_lead(app.config["SCHEDULER_LEADER_RETRY_SECONDS"])
+
+
+def _try_lead(retry_seconds):
+    global _scheduler
+    if _lock.acquire():
+        logger.info(f"Process {os.getpid()} elected scheduler leader")
+        _scheduler = BackgroundScheduler()
+        add_jobs(_scheduler)
+        _scheduler.start()
+        atexit.register(shutdown)
+        return
+
+    timer = threading.Timer(retry_seconds, _try_lead, args=(retry_seconds,))
+    timer.daemon = True
+    timer.start()
+
+
+def shutdown():
+    if _scheduler and _scheduler.running:
+        _scheduler.shutdown()
+    if _lock:
+        _lock.release()
+
+
+def main():
+    """Standalone entry point: `python scheduler.py` runs the jobs outside the web workers."""
+    from app import app
+
+    lock = LeaderLock(app.config["SCHEDULER_LOCK_FILE"])
+    retry_seconds = app.config["SCHEDULER_LEADER_RETRY_SECONDS"]
+    while not lock.acquire():
+        print(f"⏳ Another process holds {lock.path}; retrying in {retry_seconds}s...")
+        time.sleep(retry_seconds)
+
+    print(f"🗓️ Scheduler leader (pid {os.getpid()}) started.")
+    scheduler = BlockingScheduler()
+    add_jobs(scheduler)
+    try:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        lock.release()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,22 @@
 import pytz
-import feedparser, httpx, asyncio, re
-from bs4 import BeautifulSoup
+import asyncio, re
 from app import app, db
-from models import NewsSource, Article
-from sqlalchemy.orm import scoped_session, sessionmaker
+from models import NewsSource, Article, ImageCache, HeadlineScore, OllamaSettings, ScrapeRun, SourceScrapeMetric, hours_since, epoch_hours, score_at
+import time
+from sqlalchemy import func, update
+from urllib.parse import urlparse
+from db import new_session
 from datetime import datetime, timedelta, UTC
 import asyncio
-from app import socketio
+from app import socketio, job_manager
+from fetcher import fetch_feeds, resolve_images
+from polling import update_poll_schedule, record_failure, in_backoff
+from retention import purge_articles, purge_history, reclaim_space
+from stories import assign_stories
+from llm import title_hash, score_titles
+from frontpage import bump_version
+from snapshot import export_snapshot
+from profiler import sql_profile
 
 BREAKING_KEYWORDS = {
     "TRADE WAR", "TRADE WARS", "BREAKING", "BREAKING NEWS", "JUST IN",
@@ -82,211 +92,621 @@ KEYWORDS_SETS = {
     "political": POLITICAL_KEYWORDS,
     "fluff": FLUFF_KEYWORDS,
 }
-def matches_keyword(text, category):
-    """Checks if the text contains any keywords from the given category using regex for more flexibility."""
-    text_lower = text.lower()
-    pattern = r'\b(' + '|'.join(re.escape(word.lower()) for word in KEYWORDS_SETS[category]) + r')\b'
-    return bool(re.search(pattern, text_lower))
+def build_keyword_matcher(keyword_sets=None):
+    """Compiles every keyword category into one regex that can be scanned in a single pass.
+
+    Each category becomes an optional lookahead group tried at every word boundary, so
+    overlapping keywords from different categories (e.g. "ransomware attack" and "attack")
+    are all reported, exactly as if each category were searched on its own.
+    """
+    keyword_sets = KEYWORDS_SETS if keyword_sets is None else keyword_sets
+    branches = []
+    for category, words in keyword_sets.items():
+        # Longest keywords first so the alternation prefers the most specific phrase.
+        alternation = '|'.join(re.escape(word.lower()) for word in sorted(words, key=len, reverse=True))
+        branches.append(rf'(?:(?=(?P<{category}>(?:{alternation})\b)))?')
+    return re.compile(r'\b' + ''.join(branches))
+
+_keyword_matcher = build_keyword_matcher()
+
+def refresh_keyword_matcher():
+    """Rebuilds the compiled matcher; call this after changing KEYWORDS_SETS at runtime.
+
+    Stored keyword masks are then stale: rescore with update_existing_article_scores(recompute_keywords=True).
+    """
+    global _keyword_matcher
+    _keyword_matcher = build_keyword_matcher()
+
+def matched_categories(text):
+    """Scans the text once and returns the set of keyword categories it mentions."""
+    if not text:
+        return frozenset()
+    found = set()
+    for match in _keyword_matcher.finditer(text.lower()):
+        for category, value in match.groupdict().items():
+            if value is not None:
+                found.add(category)
+    return frozenset(found)
+
+KEYWORD_CATEGORIES = list(KEYWORDS_SETS)
+
+def categories_to_mask(categories):
+    """Packs a set of keyword categories into the integer stored on Article.keyword_mask."""
+    return sum(1 << i for i, category in enumerate(KEYWORD_CATEGORIES) if category in categories)
+
+def mask_to_categories(mask):
+    return frozenset(category for i, category in enumerate(KEYWORD_CATEGORIES) if mask & (1 << i))
 
-async def fetch_page(url):
-    """Fetches a webpage asynchronously."""
-    try:
-        async with httpx.AsyncClient(timeout=5) as client:
-            response = await client.get(url, headers={"User-Agent": "Mozilla/5.0"})
-            return response.text
-    except Exception as e:
-        print(f"⚠️ Failed to fetch page: {url} | Error: {e}")
-        return None
+def matches_keyword(text, category):
+    """Checks if the text contains any keywords from the given category."""
+    return category in matched_categories(text)
 
 async def extract_image_from_page(article_url):
-    """Attempts to extract an image from the article page (fallback)."""
-    html = await fetch_page(article_url)
-    if not html:
-        return None
-
-    soup = BeautifulSoup(html, 'html.parser')
-
-
-    og_image = soup.find("meta", property="og:image")
-    if og_image and "content" in og_image.attrs:
-        return og_image["content"]
-
-    first_img = soup.find("img")
-    if first_img and "src" in first_img.attrs:
-        return first_img["src"]
-
-    return None  
-
-def calculate_article_score(article, entry=None):
-    """Determines how 'big' an article is based on multiple factors."""
-    score = 0
-
+    """Attempts to extract the preview image from the article page (fallback)."""
+    images = await resolve_images([article_url])
+    image_url, _error = images.get(article_url, (None, None))
+    return image_url
+
+def entry_engagement(entry):
+    """Bonus for points/comments reported by aggregator feeds (e.g. Hacker News)."""
+    engagement = 0
+    try:
+        engagement += min(int(entry.get("points", 0)) * 0.2, 20)
+    except (ValueError, TypeError):
+        pass 
 
+    try:
+        feed_comments = int(entry.get("comments", 0))  
+        engagement += min(feed_comments * 0.1, 10)
+    except (ValueError, TypeError):
+        print(f"⚠️ Skipping invalid comment count: {entry.get('comments', 'N/A')}")
+    return engagement
+
+def score_components(article, entry=None, matched=None):
+    """Splits an article's score into its static part and how it decays with age.
+
+    Returns (engagement, base_score, decay_rate, score_cap). `article` only needs `title` and
+    `url` (plus `engagement` when no entry is given), so plain result rows work too; pass
+    `matched` when the keyword categories are already known to skip the regex scan.
+    """
     if entry:
-        try:
-            score += min(int(entry.get("points", 0)) * 0.2, 20)
-        except (ValueError, TypeError):
-            pass 
-
-        try:
-            feed_comments = int(entry.get("comments", 0))  
-            score += min(feed_comments * 0.1, 10)
-        except (ValueError, TypeError):
-            print(f"⚠️ Skipping invalid comment count: {entry.get('comments', 'N/A')}")
-            feed_comments = 0  
+        engagement = entry_engagement(entry)
+    else:
+        engagement = getattr(article, "engagement", None) or 0
+    score = engagement
 
+    if matched is None:
+        matched = matched_categories(article.title)
 
     for category, weight in {
         "breaking": 20, "security": 10, "economic": 7, "disaster": 15,
         "health": 5, "political": 13, "fluff": -10
     }.items():
-        if matches_keyword(article.title, category):
+        if category in matched:
             score += weight
 
-    combo_categories = sum(matches_keyword(article.title, cat) for cat in ["breaking", "security", "economic", "political"])
+    combo_categories = sum(cat in matched for cat in ["breaking", "security", "economic", "political"])
     if combo_categories > 1:
         score += combo_categories * 5 
-        print(f"🔥 Combo category bonus: {combo_categories * 5} (Matched {combo_categories} categories)")
-
 
-    
     if any(source in article.url.lower() for source in HIGH_PRIORITY_SOURCES):
         score += 8
 
-    age_penalty = max(0, (article.age_in_hours() / 12) * 2)
-    if matches_keyword(article.title, "political"):
-        age_penalty *= 0.25 
-    score -= age_penalty
+    # Stories reported by several sources (see stories.assign_stories)
+    score += getattr(article, "story_boost", None) or 0
 
-    if matches_keyword(article.title, "fluff"):
-        score = min(score, 10)
+    # LLM importance rating, when one is available (see apply_llm_scores)
+    llm_score = getattr(article, "llm_score", None)
+    if llm_score is not None:
+        score += app.config["LLM_SCORE_WEIGHT"] * (llm_score - 5)
 
-    return max(0, score)
+    # Two points per 12 hours of age; political stories fade four times slower.
+    decay_rate = 2 / 12
+    if "political" in matched:
+        decay_rate *= 0.25 
 
+    score_cap = 10 if "fluff" in matched else None
+    return engagement, score, decay_rate, score_cap
 
+def calculate_article_score(article, entry=None, matched=None):
+    """Determines how 'big' an article is right now based on multiple factors."""
+    _engagement, base_score, decay_rate, score_cap = score_components(article, entry=entry, matched=matched)
+    return score_at(base_score, decay_rate, score_cap, hours_since(article.timestamp))
 
-async def update_existing_article_scores():
-    """ Updates scores for all articles already in the database. """
-    with app.app_context():
-        Session = scoped_session(sessionmaker(bind=db.engine))
-        session = Session()
+def parse_entry(entry):
+    """Pulls (title, url, image_url) out of a feed entry, or returns None if it is unusable."""
+    try:
+        title = entry.title.strip() if entry.title else "Untitled"
+        url = entry.link
+    except AttributeError as e:
+        print(f"⚠️ Skipping entry due to missing fields: {e}")
+        return None
+    if not title:
+        print(f"⚠️ Missing title for {url}, skipping...")
+        return None
 
-        articles = session.query(Article).all()
-        for article in articles:
-            article.score = calculate_article_score(article)
+    image_url = None
+    try:
+        if "media_content" in entry and entry.media_content:
+            image_url = entry.media_content[0]['url']
+        elif "enclosures" in entry and entry.enclosures:
+            image_url = entry.enclosures[0]['href']
+    except (KeyError, IndexError):
+        image_url = None
+    return title, url, image_url
+
+def find_existing_articles(session, urls, image_urls):
+    """Looks up already-stored articles for a whole feed in one query.
+
+    Returns two dicts keyed by url and by image_url, so each entry can be matched in memory.
+    """
+    by_url, by_image = {}, {}
+    if not urls and not image_urls:
+        return by_url, by_image
+
+    condition = Article.url.in_(list(urls))
+    if image_urls:
+        condition = condition | Article.image_url.in_(list(image_urls))
+
+    for article in session.query(Article).filter(condition):
+        by_url[article.url] = article
+        if article.image_url:
+            by_image.setdefault(article.image_url, article)
+    return by_url, by_image
+
+def url_domain(url):
+    return urlparse(url).netloc.lower()
+
+def image_cache_ttls():
+    return {
+        "found": timedelta(hours=app.config["IMAGE_CACHE_TTL_FOUND"]),
+        "missing": timedelta(hours=app.config["IMAGE_CACHE_TTL_MISSING"]),
+        "error": timedelta(hours=app.config["IMAGE_CACHE_TTL_ERROR"]),
+    }
+
+def domains_without_images(session, domains, since):
+    """Returns the domains whose recent pages repeatedly had no preview image at all."""
+    if not domains:
+        return set()
+    rows = session.query(ImageCache.domain, ImageCache.status, func.count(ImageCache.id)).filter(
+        ImageCache.domain.in_(list(domains)), ImageCache.checked_at >= since
+    ).group_by(ImageCache.domain, ImageCache.status)
+
+    counts = {}
+    for domain, status, count in rows:
+        counts.setdefault(domain, {})[status] = count
+    limit = app.config["IMAGE_CACHE_DOMAIN_MISS_LIMIT"]
+    return {
+        domain for domain, by_status in counts.items()
+        if by_status.get("missing", 0) >= limit and not by_status.get("found")
+    }
+
+def lookup_image_cache(session, urls, now):
+    """Splits urls into fresh cache hits and the ones that still need a page fetch.
+
+    Returns (hits, pending, entries): hits maps url -> cached image_url (None for negative
+    entries), pending lists urls to fetch, entries holds every cache row that was loaded.
+    """
+    ttls = image_cache_ttls()
+    entries = {entry.article_url: entry for entry in session.query(ImageCache).filter(ImageCache.article_url.in_(urls))}
+    hits = {url: entry.image_url for url, entry in entries.items() if entry.is_fresh(ttls, now)}
+    pending = [url for url in urls if url not in hits]
+
+    blocked = domains_without_images(session, {url_domain(url) for url in pending}, now - ttls["missing"])
+    if blocked:
+        print(f"🚫 Skipping image lookups for {len(blocked)} domains without preview images")
+        pending = [url for url in pending if url_domain(url) not in blocked]
+    return hits, pending, entries
+
+async def apply_llm_scores():
+    """Rates recent unrated headlines with the configured Ollama model and folds the rating in.
+
+    Picks up to LLM_MAX_ARTICLES of the newest articles without a rating, so headlines a
+    previous run couldn't rate in time are retried. Ratings are cached by title hash, so a
+    headline syndicated across feeds or re-published later is only sent to the model once.
+    No database session is held while waiting on the model. Returns the number of articles
+    whose score changed.
+    """
+    session = new_session()
+    settings = session.query(OllamaSettings).first()
+    if not settings or not settings.enabled or not settings.selected_model:
+        session.close()
+        return 0
+    base_url, model = settings.base_url, settings.selected_model
+
+    cutoff = datetime.now(UTC) - timedelta(hours=app.config["RETENTION_HOURS"])
+    articles = session.query(Article.id, Article.title).filter(
+        Article.llm_score.is_(None), Article.timestamp >= cutoff
+    ).order_by(Article.id.desc()).limit(app.config["LLM_MAX_ARTICLES"]).all()
+    if not articles:
+        session.close()
+        return 0
+    hashes = {article.title: title_hash(article.title) for article in articles}
+    cached = {
+        row.title_hash: row.score
+        for row in session.query(HeadlineScore.title_hash, HeadlineScore.score).filter(
+            HeadlineScore.title_hash.in_(set(hashes.values())), HeadlineScore.model == model
+        )
+    }
+    session.close()
+
+    # One title per hash, so headlines differing only in case or spacing are rated once
+    pending = list({key: title for title, key in hashes.items() if key not in cached}.values())
+    print(f"🤖 Rating {len(pending)} headlines with {model} ({len(cached)} cached)...")
+
+    rated = await score_titles(
+        base_url, model, pending,
+        batch_size=app.config["LLM_BATCH_SIZE"],
+        max_concurrency=app.config["LLM_MAX_CONCURRENCY"],
+        timeout=app.config["LLM_TIMEOUT"],
+        deadline=app.config["LLM_DEADLINE"],
+    )
+
+    session = new_session()
+    # Ratings from a previously selected model are replaced
+    session.query(HeadlineScore).filter(
+        HeadlineScore.title_hash.in_([hashes[title] for title in rated])
+    ).delete(synchronize_session=False)
+    session.add_all(
+        HeadlineScore(title_hash=hashes[title], model=model, score=score)
+        for title, score in rated.items()
+    )
+    cached.update({hashes[title]: score for title, score in rated.items()})
+
+    ratings = {article.id: cached.get(hashes[article.title]) for article in articles}
+    rated_ids = [article_id for article_id, rating in ratings.items() if rating is not None]
+    updated = 0
+    for article in session.query(Article).filter(Article.id.in_(rated_ids)) if rated_ids else []:
+        previous = (article.base_score, article.decay_rate, article.score_cap)
+        article.llm_score = ratings[article.id]
+        _engagement, *components = score_components(article)
+        article.set_score_components(*components)
+        if (article.base_score, article.decay_rate, article.score_cap) != previous:
+            updated += 1
+    session.commit()
+    session.close()
+    return updated
+
+async def backfill_images(session, urls):
+    """Resolves preview images for image-less articles in one bounded stage and stores them.
+
+    The image cache is consulted first so pages that were already resolved, had no image, or
+    recently failed are not downloaded again until their TTL runs out.
+    """
+    urls = list(dict.fromkeys(urls))
+    now = datetime.now(UTC)
+    hits, pending, entries = lookup_image_cache(session, urls, now)
+    # End the read transaction so the page fetches don't pin a WAL snapshot; commit rather
+    # than rollback, which would expire the loaded cache entries.
+    session.commit()
+    print(f"🔍 Fetching images for {len(pending)} articles ({len(hits)} cached)...")
+
+    images = {}
+    if pending:
+        images = await resolve_images(
+            pending,
+            max_concurrency=app.config["SCRAPER_IMAGE_CONCURRENCY"],
+            max_per_host=app.config["SCRAPER_MAX_PER_HOST"],
+            timeout=app.config["SCRAPER_FETCH_TIMEOUT"],
+            deadline=app.config["SCRAPER_FETCH_DEADLINE"],
+            max_bytes=app.config["SCRAPER_IMAGE_MAX_BYTES"],
+        )
+
+    for url, (image_url, error) in images.items():
+        entry = entries.get(url)
+        if entry is None:
+            entry = ImageCache(article_url=url, domain=url_domain(url))
+            session.add(entry)
+        entry.image_url = image_url
+        entry.status = "found" if image_url else ("error" if error else "missing")
+        entry.checked_at = now
+
+    found = {url: image_url for url, image_url in hits.items() if image_url}
+    found.update({url: image_url for url, (image_url, _error) in images.items() if image_url})
+
+    updated = 0
+    if found:
+        for article in session.query(Article).filter(Article.url.in_(list(found))):
+            if article.image_url != found[article.url]:
+                article.image_url = found[article.url]
+                updated += 1
+                print(f"📸 Updated image for: {article.title} -> {article.image_url}")
+    session.commit()
+    return updated, pending
+
+async def update_existing_article_scores(chunk_size=None, recompute_keywords=False):
+    """Backfills and refreshes the stored score components in id-ordered chunks.
+
+    Ranking decays at query time, so this no longer has to run on a schedule: it only writes
+    rows whose components are missing (written before they existed) or have changed, e.g.
+    after the keyword sets were edited and `recompute_keywords` is set.
+    """
+    with app.app_context():
+        session = new_session()
+        chunk_size = chunk_size or app.config["RESCORE_CHUNK_SIZE"]
+
+        last_id = 0
+        scanned = changed = 0
+        while True:
+            rows = session.query(
+                Article.id, Article.title, Article.url, Article.timestamp, Article.keyword_mask,
+                Article.engagement, Article.base_score, Article.decay_rate, Article.score_cap,
+                Article.decay_origin, Article.story_boost, Article.llm_score,
+            ).filter(Article.id > last_id).order_by(Article.id).limit(chunk_size).all()
+            if not rows:
+                break
+
+            updates = []
+            for row in rows:
+                mask = row.keyword_mask
+                if mask is None or recompute_keywords:
+                    mask = categories_to_mask(matched_categories(row.title))
+                engagement, base_score, decay_rate, score_cap = score_components(
+                    row, matched=mask_to_categories(mask)
+                )
+                stored = (row.keyword_mask, row.base_score, row.decay_rate, row.score_cap)
+                if row.decay_origin is None or stored != (mask, base_score, decay_rate, score_cap):
+                    updates.append({
+                        "id": row.id,
+                        "keyword_mask": mask,
+                        "engagement": engagement,
+                        "base_score": base_score,
+                        "decay_rate": decay_rate,
+                        "score_cap": score_cap,
+                        "decay_origin": base_score + decay_rate * epoch_hours(row.timestamp),
+                        "score": score_at(base_score, decay_rate, score_cap, hours_since(row.timestamp)),
+                    })
+
+            if updates:
+                session.execute(update(Article), updates)
+                session.commit()
+            scanned += len(rows)
+            changed += len(updates)
+            last_id = rows[-1].id
 
-        session.commit()
         session.close()
-        print("✅ Re-scored existing articles in the database.")
+        if changed:
+            bump_version()
+        print(f"✅ Re-scored existing articles in the database ({changed} of {scanned} changed).")
+
+async def scrape_articles(source_id=None, progress=None, due_only=False):
+    """Scrapes articles from a specific source or all sources if no ID is provided.
+
+    With `due_only`, only enabled sources whose adaptive poll time has come are fetched.
+
+    `progress`, when given, is called with a message and structured fields at each stage
+    (the job manager forwards these to the settings page).
+    """
+    def report(message, **data):
+        print(message)
+        if progress:
+            progress(message=message, **data)
 
-async def scrape_articles(source_id=None):
-    """Scrapes articles from a specific source or all sources if no ID is provided."""
     with app.app_context():
-        Session = scoped_session(sessionmaker(bind=db.engine))
-        session = Session()
+        session = new_session()
 
-        sources = session.query(NewsSource).filter(
+        query = session.query(NewsSource).filter(
             (NewsSource.id == source_id) if source_id else NewsSource.enabled == True
-        ).all()
+        )
+        if due_only and not source_id:
+            now = datetime.now(UTC)
+            query = query.filter((NewsSource.next_poll_at == None) | (NewsSource.next_poll_at <= now))
+        sources = query.all()
+        if not source_id:
+            # Failing feeds wait out their backoff even on manual full runs.
+            now = datetime.now(UTC)
+            sources = [source for source in sources if not in_backoff(source, now)]
+
+        run = ScrapeRun(started_at=datetime.now(UTC), sources=len(sources))
+        session.add(run)
+        session.commit()
+        run_started = time.perf_counter()
 
         new_articles_count = 0
         rescored_articles_count = 0
+        not_modified_count = 0
+        unchanged_count = 0
+        bytes_received = 0
+        image_tasks = {}  # article url -> metric of the source it came from
+
+        report(f"🔄 Fetching {len(sources)} feeds...", stage="fetch", total=len(sources))
+        feeds = fetch_feeds(
+            sources,
+            max_concurrency=app.config["SCRAPER_MAX_CONCURRENCY"],
+            max_per_host=app.config["SCRAPER_MAX_PER_HOST"],
+            timeout=app.config["SCRAPER_FETCH_TIMEOUT"],
+            deadline=app.config["SCRAPER_FETCH_DEADLINE"],
+        )
+
+        async for source, result in feeds:
+            print(f"🔄 Processing articles from {source.name} ({source.url})...")
+
+            bytes_received += result.bytes_received
+            metric = SourceScrapeMetric(
+                run_id=run.id, source_id=source.id, status="success", http_status=result.status_code,
+                fetch_seconds=result.fetch_seconds, parse_seconds=result.parse_seconds,
+                bytes_received=result.bytes_received, entries=0, new_articles=0, rescored_articles=0,
+                image_fetches=0,
+            )
+            session.add(metric)
+
+            if result.error:
+                metric.status = "error"
+                report(f"❌ Failed to fetch {source.url}: {result.error}",
+                       stage="source", source=source.name, status="error", error=result.error)
+                if record_failure(source, result.error, datetime.now(UTC), app.config):
+                    report(f"🚫 Disabled {source.name} after {source.consecutive_failures} consecutive failures",
+                           stage="source", source=source.name, status="quarantined")
+                session.commit()
+                continue
 
-        for source in sources:
-            print(f"🔄 Fetching articles from {source.name} ({source.url})...")
-            feed = feedparser.parse(source.url)
+            if result.cache_hit:
+                metric.status = "unchanged"
+                if result.not_modified:
+                    not_modified_count += 1
+                else:
+                    unchanged_count += 1
+                report(f"⏭️ Unchanged since last run: {source.url}",
+                       stage="source", source=source.name, status="unchanged")
+                source.etag, source.last_modified = result.etag, result.last_modified
+                source.scrape_status = "Success (unchanged)"
+                update_poll_schedule(source, 0, datetime.now(UTC), app.config)
+                session.commit()
+                continue
 
-            if "entries" not in feed or not feed.entries:
-                print(f"❌ No entries found in {source.url}")
-                source.scrape_status = "Error: No entries found"
+            feed = result.feed
+            if not result.entries:
+                metric.status = "empty"
+                report(f"❌ No entries found in {source.url}",
+                       stage="source", source=source.name, status="empty")
+                if record_failure(source, "No entries found", datetime.now(UTC), app.config):
+                    report(f"🚫 Disabled {source.name} after {source.consecutive_failures} consecutive failures",
+                           stage="source", source=source.name, status="quarantined")
                 session.commit()
                 continue
 
             source.scrape_status = "Success"
-            session.commit()
-
-            tasks = []  
 
+            candidates = []
+            seen_urls, seen_images = set(), set()
             for entry in feed.entries:
-                try:
-                    title = entry.title.strip() if entry.title else "Untitled"
-                    url = entry.link
-                    image_url = None
-                    if not title:
-                        print(f"⚠️ Missing title for {entry.link}, skipping...")
-                        continue
-
-                    if "media_content" in entry and entry.media_content:
-                        image_url = entry.media_content[0]['url']
-                    elif "enclosures" in entry and entry.enclosures:
-                        image_url = entry.enclosures[0]['href']
-
-                    if not image_url:
-                        tasks.append(url)
-
-                    existing_article = session.query(Article).filter(
-                        (Article.url == url) | (Article.image_url == image_url)
-                    ).first()
-
-                    if not existing_article:
-                        new_article = Article(title=title, url=url, image_url=image_url, source_id=source.id)
-                        new_article.score = calculate_article_score(new_article, entry=entry)
-                        session.add(new_article)
-                        new_articles_count += 1
-                        print(f"✅ Added: {title} (Score: {new_article.score}, Image: {image_url})")
-                    else:
-                       
-                        old_score = existing_article.score
-                        new_score = calculate_article_score(existing_article, entry=entry)
-
-                        if new_score != old_score:  
-                            existing_article.score = new_score
-                            rescored_articles_count += 1
-                            print(f"♻️ Re-scored: {title} (Old Score: {old_score} → New Score: {new_score})")
-
-                except AttributeError as e:
-                    print(f"⚠️ Skipping entry due to missing fields: {e}")
-
-
+                candidate = parse_entry(entry)
+                if not candidate:
+                    continue
+                title, url, image_url = candidate
+                if url in seen_urls or (image_url and image_url in seen_images):
+                    continue
+                seen_urls.add(url)
+                if image_url:
+                    seen_images.add(image_url)
+                candidates.append((entry, title, url, image_url))
+
+            by_url, by_image = find_existing_articles(session, seen_urls, seen_images)
+
+            new_articles = []
+            for entry, title, url, image_url in candidates:
+                existing_article = by_url.get(url) or (by_image.get(image_url) if image_url else None)
+
+                if not image_url and not (existing_article and existing_article.image_url):
+                    image_tasks[url] = metric
+
+                if not existing_article:
+                    matched = matched_categories(title)
+                    new_article = Article(title=title, url=url, image_url=image_url, source_id=source.id,
+                                          timestamp=datetime.now(UTC), keyword_mask=categories_to_mask(matched))
+                    engagement, *components = score_components(new_article, entry=entry, matched=matched)
+                    new_article.engagement = engagement
+                    new_article.set_score_components(*components)
+                    new_articles.append(new_article)
+                    print(f"✅ Added: {title} (Score: {new_article.score}, Image: {image_url})")
+                else:
+                    old_score = existing_article.base_score
+                    if existing_article.keyword_mask is None:
+                        existing_article.keyword_mask = categories_to_mask(matched_categories(existing_article.title))
+                    matched = mask_to_categories(existing_article.keyword_mask)
+                    engagement, *components = score_components(existing_article, entry=entry, matched=matched)
+
+                    if components[0] != old_score or existing_article.decay_origin is None:
+                        existing_article.engagement = engagement
+                        existing_article.set_score_components(*components)
+                        rescored_articles_count += 1
+                        metric.rescored_articles += 1
+                        print(f"♻️ Re-scored: {title} (Old Score: {old_score} → New Score: {components[0]})")
+
+            session.add_all(new_articles)
+            session.flush()
+            stories = assign_stories(session, new_articles, app.config)
+            if stories:
+                print(f"🧩 {len(stories)} stories picked up another report from {source.name}")
+            new_articles_count += len(new_articles)
+            metric.entries = len(feed.entries)
+            metric.new_articles = len(new_articles)
+            update_poll_schedule(source, len(new_articles), datetime.now(UTC), app.config)
+            # Validators go in the same commit as the entries: if ingesting fails, the next
+            # run must not see a 304 or an identical body and skip them for good.
+            source.etag, source.last_modified = result.etag, result.last_modified
+            source.content_hash = result.content_hash
             session.commit()
+            report(f"📰 {source.name}: {len(new_articles)} new of {len(candidates)} entries",
+                   stage="source", source=source.name, status="success",
+                   entries=len(candidates), new=len(new_articles))
+
+        images_updated = 0
+        image_fetches = []
+        if image_tasks:
+            report(f"🔍 Resolving images for {len(image_tasks)} articles...", stage="images", total=len(image_tasks))
+            with sql_profile("scrape:images"):
+                images_updated, image_fetches = await backfill_images(session, list(image_tasks))
+
+        for url in image_fetches:
+            image_tasks[url].image_fetches += 1
+        run.finished_at = datetime.now(UTC)
+        run.duration_seconds = time.perf_counter() - run_started
+        run.new_articles = new_articles_count
+        run.rescored_articles = rescored_articles_count
+        run.image_fetches = len(image_fetches)
+        session.commit()
 
-            if tasks:
-                print(f"🔍 Fetching images for {len(tasks)} articles...")
-                results = await asyncio.gather(*[extract_image_from_page(url) for url in tasks])
-
-                for url, image_url in zip(tasks, results):
-                    if image_url:
-                        article = session.query(Article).filter_by(url=url).first()
-                        if article:
-                            article.image_url = image_url
-                            session.commit()
-                            print(f"📸 Updated image for: {article.title} -> {image_url}")
-
+        if new_articles_count or rescored_articles_count or images_updated:
+            bump_version()
         session.close()
 
         total_articles = session.query(Article).count()
-        print("✅ Scraping complete.")
         print(f"🆕 New articles added: {new_articles_count}")
         print(f"🔄 Articles rescored: {rescored_articles_count}")
+        cache_hits = not_modified_count + unchanged_count
+        hit_rate = (cache_hits / len(sources) * 100) if sources else 0
+        print(f"📦 Feed cache hits: {cache_hits}/{len(sources)} ({hit_rate:.0f}%) "
+              f"— {not_modified_count} not modified, {unchanged_count} identical body, "
+              f"{bytes_received} bytes downloaded")
         print(f"📊 Total articles in database: {total_articles}")
+        report("✅ Scraping complete.", stage="done", new=new_articles_count, rescored=rescored_articles_count,
+               images=images_updated, cache_hits=cache_hits, sources=len(sources), total_articles=total_articles)
+        return new_articles_count
 
 
 def cleanup_old_articles():
-    """Deletes articles older than 48 hours or articles with a score of 0 or less."""
+    """Deletes articles older than RETENTION_HOURS or with a live score of 0 or less.
+
+    Deletes run in small committed chunks (optionally archiving the rows first), expired
+    telemetry and image cache entries are pruned, and freed pages are handed back to the
+    filesystem with an incremental vacuum.
+    """
     with app.app_context():
-        session = scoped_session(sessionmaker(bind=db.engine))()
-        cutoff_time = datetime.now(UTC) - timedelta(hours=48)  
-        old_deleted = session.query(Article).filter(Article.timestamp < cutoff_time).delete(synchronize_session=False)
-        score_deleted = session.query(Article).filter(Article.score <= 0).delete(synchronize_session=False)
+        session = new_session()
+        now = datetime.now(UTC)
+        retention_hours = app.config["RETENTION_HOURS"]
+        chunk_size = app.config["RETENTION_CHUNK_SIZE"]
+        archive_dir = app.config["RETENTION_ARCHIVE_DIR"]
+
+        cutoff_time = now - timedelta(hours=retention_hours)  
+        old_deleted = purge_articles(session, Article.timestamp < cutoff_time, chunk_size, archive_dir, now)
+        score_deleted = purge_articles(session, Article.rank_at(now) <= 0, chunk_size, archive_dir, now)
 
         total_deleted = old_deleted + score_deleted  
 
-        session.commit()
+        runs_deleted, images_deleted, ratings_deleted = purge_history(
+            session,
+            metrics_cutoff=now - timedelta(days=app.config["METRICS_RETENTION_DAYS"]),
+            image_cache_cutoff=now - max(image_cache_ttls().values()),
+            headline_cutoff=cutoff_time,
+        )
         session.close()
 
-        print(f"🗑️ Deleted {old_deleted} articles older than 48 hours.")
+        if total_deleted:
+            bump_version()
+
+        pages_freed = reclaim_space(db.engine, app.config["RETENTION_VACUUM_PAGES"])
+
+        print(f"🗑️ Deleted {old_deleted} articles older than {retention_hours:g} hours.")
         print(f"🗑️ Deleted {score_deleted} articles with a score of 0 or less.")
         print(f"🗑️ Total articles deleted: {total_deleted}.")  
+        print(f"🗑️ Pruned {runs_deleted} scrape runs, {images_deleted} image cache entries "
+              f"and {ratings_deleted} headline ratings.")
+        if archive_dir and total_deleted:
+            print(f"📦 Archived deleted articles to {archive_dir}")
+        if pages_freed is not None:
+            print(f"🧹 Released {pages_freed} free pages back to the filesystem.")
 
 def age_in_hours(self):
     """Returns the age of the article in hours, accounting for time zone awareness."""
@@ -309,8 +729,56 @@ def run_scraper():
 
 
 
+def export_static_snapshot():
+    """Re-exports the static front page when SNAPSHOT_DIR is set."""
+    if app.config["SNAPSHOT_DIR"]:
+        with app.app_context(), sql_profile("snapshot"):
+            export_snapshot(app)
+
+
+def run_maintenance_job(progress=None):
+    """Backfills score components and prunes expired articles."""
+    with sql_profile("rescore"):
+        asyncio.run(update_existing_article_scores())
+    with sql_profile("cleanup"):
+        cleanup_old_articles()
+    export_static_snapshot()
+
+
+def run_rating_job(progress=None):
+    """Blends LLM headline ratings into scores, separately from the scrape that found them."""
+    with app.app_context(), sql_profile("llm"):
+        updated = asyncio.run(apply_llm_scores())
+        if updated:
+            print(f"🤖 Blended LLM ratings into {updated} article scores")
+            bump_version()
+    if updated:
+        export_static_snapshot()
+
+
+def run_scrape_job(progress=None, due_only=False, maintenance=True):
+    """Scrape pipeline shared by the CLI, the scheduler and the in-process job runner.
+
+    The scheduler's frequent adaptive-polling tick passes due_only=True, maintenance=False and
+    leaves rescoring and cleanup to its own, less frequent maintenance job. New articles are
+    handed to a separate "rate" job, so model latency never holds up this one. Maintenance
+    is likewise submitted as a "maintenance" job, so it holds that job's lock and never runs
+    alongside a scheduled maintenance run in this or another process.
+    """
+    with sql_profile("scrape"):
+        new_articles = asyncio.run(scrape_articles(progress=progress, due_only=due_only))
+    if new_articles:
+        job_manager.submit("rate", run_rating_job)
+    if maintenance:
+        job_manager.submit("maintenance", run_maintenance_job)
+    export_static_snapshot()
+
+
 if __name__ == "__main__":
-    import sys
-    asyncio.run(scrape_articles())
-    asyncio.run(update_existing_article_scores()) 
-    cleanup_old_articles() 
\ No newline at end of file
+    # Through the job manager, so a CLI or cron run takes the same cross-process scrape lock
+    # as the server's scheduled and manual scrapes. Follow-up jobs finish before exit.
+    job, _created = job_manager.submit("scrape", run_scrape_job)
+    if job is None:
+        print("⏭️ Skipping scrape: another process is running one.")
+    else:
+        job.future.result() 
\ No newline at end of file
@@ -0,0 +1,109 @@
+import re
+import threading
+
+from sqlalchemy import column, literal_column, select, table, text
+
+from models import Article, NewsSource
+
+# External-content FTS5 index over article titles: it stores only the token index and reads
+# titles from `article`, and the triggers keep it in step with every insert, update and
+# delete no matter which code path writes.
+SEARCH_INDEX_DDL = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS article_fts USING fts5(
+        title, content='article', content_rowid='id', tokenize='porter unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS article_fts_insert AFTER INSERT ON article BEGIN
+        INSERT INTO article_fts(rowid, title) VALUES (new.id, new.title);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS article_fts_delete AFTER DELETE ON article BEGIN
+        INSERT INTO article_fts(article_fts, rowid, title) VALUES ('delete', old.id, old.title);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS article_fts_update AFTER UPDATE OF title ON article BEGIN
+        INSERT INTO article_fts(article_fts, rowid, title) VALUES ('delete', old.id, old.title);
+        INSERT INTO article_fts(rowid, title) VALUES (new.id, new.title);
+    END""",
+)
+
+article_fts = table("article_fts", column("rowid"), column("rank"))
+
+_ready = set()
+_lock = threading.Lock()
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def ensure_search_index(engine):
+    """Creates the FTS5 table and its triggers if missing, indexing existing rows once.
+
+    Returns False when the database isn't SQLite (search then falls back to LIKE).
+    """
+    if engine.dialect.name != "sqlite":
+        return False
+    if engine.url in _ready:
+        return True
+
+    with _lock, engine.begin() as connection:
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'article_fts'")
+        ).first()
+        for statement in SEARCH_INDEX_DDL:
+            connection.execute(text(statement))
+        if not exists:
+            connection.execute(text("INSERT INTO article_fts(article_fts) VALUES ('rebuild')"))
+            print("🔎 Built the headline search index")
+        _ready.add(engine.url)
+    return True
+
+
+def match_expression(query):
+    """Turns free text into a safe FTS5 query: every word must match, the last as a prefix."""
+    tokens = _TOKEN.findall(query)
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def search_articles(engine, query, now, limit=20, offset=0, candidates=500, text_weight=5.0):
+    """Headlines matching `query`, ordered by text relevance blended with the live score.
+
+    The FTS index picks the `candidates` best text matches (bm25) first, so the cost stays
+    bounded however many rows contain a common word; those are then re-ordered by
+    text_weight * relevance + rank. Returns a list of dicts.
+    """
+    rank = Article.rank_at(now)
+    columns = (
+        Article.id, Article.title, Article.url, Article.image_url, Article.timestamp, rank.label("score"),
+        NewsSource.name.label("source"), NewsSource.category,
+    )
+
+    if ensure_search_index(engine):
+        match = match_expression(query)
+        if not match:
+            return []
+        best = (
+            select(article_fts.c.rowid.label("id"), (-article_fts.c.rank).label("relevance"))
+            .where(literal_column("article_fts").op("MATCH")(match))
+            .order_by(article_fts.c.rank)
+            .limit(candidates)
+            .subquery()
+        )
+        relevance = best.c.relevance
+        statement = select(*columns, relevance.label("relevance")).join(best, best.c.id == Article.id)
+    else:
+        words = _TOKEN.findall(query)
+        if not words:
+            return []
+        relevance = literal_column("0")
+        statement = select(*columns, relevance.label("relevance")).where(
+            *(Article.title.ilike(f"%{word}%") for word in words)
+        )
+
+    statement = (
+        statement.join(NewsSource, Article.source_id == NewsSource.id)
+        .order_by((relevance * text_weight + rank).desc(), Article.id.desc())
+        .limit(limit)
+        .offset(offset)
+    )
+    with engine.connect() as connection:
+        return [row._asdict() for row in connection.execute(statement)]
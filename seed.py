@@ -1,5 +1,9 @@
+import argparse
+import xml.etree.ElementTree as ET
+
 import requests
-from bs4 import BeautifulSoup
+from sqlalchemy import insert
+
 from app import app, db
 from models import NewsSource
 
@@ -8,36 +12,74 @@ OPML_SOURCES = {
     "Tech": "https://raw.githubusercontent.com/spians/awesome-RSS-feeds/master/recommended/with_category/Tech.opml"
 }
 
+def parse_opml(content, category=None):
+    """Yields (name, url, category) for every feed outline in an OPML document.
+
+    Without an explicit category, feeds take the title of the folder outline they sit in.
+    """
+    def walk(parent, folder):
+        for outline in parent.findall("outline"):
+            xml_url = (outline.get("xmlUrl") or "").strip()
+            title = (outline.get("title") or outline.get("text") or "").strip()
+            if xml_url:
+                yield title or xml_url, xml_url, category or folder
+            else:
+                yield from walk(outline, title or folder)
+
+    body = ET.fromstring(content).find("body")
+    if body is not None:
+        yield from walk(body, None)
+
+def import_feeds(feeds):
+    """Inserts feeds whose URL isn't known yet, in one transaction. Returns (added, skipped).
+
+    Existing URLs are loaded once up front, so the cost doesn't grow with a query per feed.
+    Must be called inside an app context.
+    """
+    known = {url for (url,) in db.session.query(NewsSource.url)}
+    rows, skipped = [], 0
+    for name, url, category in feeds:
+        if url in known or len(url) > 500:
+            skipped += 1
+            continue
+        known.add(url)
+        rows.append({"name": name[:255], "url": url, "scraping_type": "rss", "category": category and category[:100]})
+
+    if rows:
+        db.session.execute(insert(NewsSource), rows)
+    db.session.commit()
+    return len(rows), skipped
+
+def import_opml_files(paths, category=None):
+    """Imports every feed from local OPML files in a single transaction."""
+    feeds = []
+    for path in paths:
+        with open(path, "rb") as f:
+            feeds.extend(parse_opml(f.read(), category))
+    with app.app_context():
+        return import_feeds(feeds)
+
 def fetch_and_seed_opml(category, opml_url):
     """Fetch and parse OPML file, then insert feeds into the database."""
     response = requests.get(opml_url)
-    
+
     if response.status_code == 200:
-        soup = BeautifulSoup(response.content, "xml")
-
-        feeds = soup.find_all("outline", recursive=True)
-        for feed in feeds:
-            title = feed.get("title")
-            xml_url = feed.get("xmlUrl")
-            description = feed.get("description", "No description available")
-            
-            if title and xml_url:
-                add_feed_to_db(title, xml_url, category, description)
+        with app.app_context():
+            added, skipped = import_feeds(parse_opml(response.content, category))
+        print(f"✅ Added {added} feeds ({skipped} already present) from {opml_url}")
     else:
         print(f"❌ Failed to fetch OPML file: {opml_url}. Status code: {response.status_code}")
 
-def add_feed_to_db(name, url, category, description):
-    """Insert a new RSS feed into the database if it doesn't already exist."""
-    with app.app_context():
-        if not NewsSource.query.filter_by(url=url).first():
-            new_source = NewsSource(name=name, url=url, scraping_type="rss", category=category)
-            db.session.add(new_source)
-            db.session.commit()
-            print(f"✅ Added: {name} - {url} (Category: {category})")
-        else:
-            print(f"⚠️ Already exists: {name} - {url}")
-
 if __name__ == "__main__":
-    for category, opml_url in OPML_SOURCES.items():
-        print(f"\n🔄 Seeding category: {category} from {opml_url}")
-        fetch_and_seed_opml(category, opml_url)
+    parser = argparse.ArgumentParser(description="Seed news sources from OPML files.")
+    parser.add_argument("files", nargs="*", help="Local OPML files to import (default: the built-in remote lists)")
+    parser.add_argument("--category", help="Category for every imported feed (default: the OPML folder name)")
+    args = parser.parse_args()
+
+    if args.files:
+        added, skipped = import_opml_files(args.files, args.category)
+        print(f"✅ Added {added} feeds, skipped {skipped} duplicates")
+    else:
+        for category, opml_url in OPML_SOURCES.items():
+            print(f"\n🔄 Seeding category: {category} from {opml_url}")
+            fetch_and_seed_opml(category, opml_url)
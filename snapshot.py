@@ -0,0 +1,119 @@
+import gzip
+import hashlib
+import os
+import re
+import shutil
+import sys
+import threading
+
+from flask import render_template, url_for
+from flask_login import AnonymousUserMixin
+
+from frontpage import front_page, ranked_articles, ranking_time, FRONT_PAGE_SIZE
+from models import NewsSource
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip variants are written
+    brotli = None
+
+
+def write_atomic(path, data):
+    """Writes via a temp file and rename, so a web server never serves a half-written file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Unique per thread too: scrape, rating and maintenance jobs can export at the same time
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def write_variants(path, data):
+    """Writes `path` plus precompressed .gz (and .br) siblings for gzip_static/brotli_static."""
+    write_atomic(f"{path}.gz", gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        write_atomic(f"{path}.br", brotli.compress(data, quality=11))
+    write_atomic(path, data)
+
+
+def category_slug(category):
+    return re.sub(r"[^a-z0-9]+", "-", category.lower()).strip("-") or "uncategorized"
+
+
+def enabled_categories():
+    return [category for (category,) in NewsSource.query.with_entities(NewsSource.category).filter(
+        NewsSource.category.isnot(None), NewsSource.enabled.is_(True)
+    ).distinct()]
+
+
+def render_category_page(category, user, now=None):
+    """The front page filtered to one category; live updates would swap in the full front page."""
+    articles, _next_cursor = ranked_articles(limit=FRONT_PAGE_SIZE, categories=[category], now=now)
+    return render_template(
+        "index.html", top_article=articles[0] if articles else None, articles=articles, user=user,
+        live=False,
+    )
+
+
+def export_stylesheet(app, out_dir):
+    """Copies static/styles.css under a content-hash name so it can be cached forever."""
+    with open(os.path.join(app.static_folder, "styles.css"), "rb") as f:
+        css = f.read()
+    name = f"styles.{hashlib.sha256(css).hexdigest()[:12]}.css"
+    path = os.path.join(out_dir, "static", name)
+    if not os.path.exists(path):
+        write_variants(path, css)
+    return f"/static/{name}"
+
+
+def export_snapshot(app, out_dir=None):
+    """Renders the anonymous front page and one page per category to static files.
+
+    Layout: index.html, category/<slug>/index.html and static/styles.<hash>.css, each with
+    precompressed variants. Returns the number of pages written, or None when no directory
+    is given and SNAPSHOT_DIR is unset.
+    """
+    out_dir = out_dir or app.config["SNAPSHOT_DIR"]
+    if not out_dir:
+        return None
+
+    with app.test_request_context("/"):
+        stylesheet = export_stylesheet(app, out_dir)
+        plain_stylesheet = url_for("static", filename="styles.css")
+        user = AnonymousUserMixin()
+
+        def fingerprint(html):
+            return html.replace(plain_stylesheet, stylesheet).encode()
+
+        # Static files never hold a live connection; they reload like the plain page
+        articles = front_page.articles()
+        pages = {"index.html": fingerprint(render_template(
+            "index.html", top_article=articles[0] if articles else None, articles=articles, user=user,
+            live=False,
+        ))}
+
+        now = ranking_time()
+        categories = enabled_categories()
+        for category in categories:
+            html = render_category_page(category, user, now=now)
+            pages[os.path.join("category", category_slug(category), "index.html")] = fingerprint(html)
+
+    for name, html in pages.items():
+        write_variants(os.path.join(out_dir, name), html)
+
+    # Categories that no longer exist would otherwise keep serving a frozen page
+    category_dir = os.path.join(out_dir, "category")
+    current = {category_slug(category) for category in categories}
+    for slug in os.listdir(category_dir) if os.path.isdir(category_dir) else []:
+        if slug not in current:
+            shutil.rmtree(os.path.join(category_dir, slug), ignore_errors=True)
+
+    print(f"📄 Exported {len(pages)} static pages to {out_dir}")
+    return len(pages)
+
+
+if __name__ == "__main__":
+    from app import app
+
+    with app.app_context():
+        export_snapshot(app, sys.argv[1] if len(sys.argv) > 1 else None)